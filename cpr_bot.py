@@ -1,15 +1,24 @@
+import atexit
 import json
 import logging
+import queue
+import random
+from array import array
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import time
 import os
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Dict, List, NamedTuple, Optional, Tuple, Any, Union
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 import requests
+from requests.adapters import HTTPAdapter
 from fyers_apiv3 import fyersModel
-import schedule
-from threading import Thread, Lock
+from fyers_apiv3.FyersWebsocket import data_ws
+from threading import Condition, Event, Thread, Lock
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import sqlite3
 from pathlib import Path
 
@@ -20,16 +29,25 @@ LOG_FILE = Path(__file__).parent / 'logs' / f'cpr_bot_{datetime.now().strftime("
 
 # Create logs directory if it doesn't exist
 LOG_FILE.parent.mkdir(exist_ok=True)
+# Size cap per log file; a chatty day rolls over into numbered backups instead of growing unbounded
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUP_COUNT = 5
 
-# Enhanced logging configuration
+# Enhanced logging configuration - records are enqueued by the caller and
+# written to file/console by a background listener thread
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(
+    _log_queue,
+    RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'),
+    logging.StreamHandler()
+)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # --- Data Classes and Enums ---
@@ -47,7 +65,101 @@ class LevelType(Enum):
     TC = "TC"
     R1 = "R1"
 
-@dataclass
+# Wall-clock time (HH:MM) at which CPR levels are recalculated each day
+DAILY_RECALC_TIME = "08:00"
+
+# Fyers quotes endpoint accepts up to 50 comma-separated symbols per request
+QUOTES_BATCH_SIZE = 50
+
+# Concurrent candle fetches per monitoring batch
+CANDLE_FETCH_WORKERS = 25
+# Longest a monitoring candle fetch waits for an API token before skipping the symbol this tick
+CANDLE_TOKEN_TIMEOUT = 30
+
+# Touch alerts waiting for the Telegram sender thread; further alerts are dropped when full
+ALERT_QUEUE_SIZE = 1000
+# Longest the sender thread gets to deliver queued alerts once monitoring stops
+ALERT_DRAIN_TIMEOUT = 60
+# Longest the CLI waits for the monitor thread to stop: the current scan's token waits,
+# the alert drain, plus margin for the in-flight fetches and the final flush
+MONITOR_STOP_TIMEOUT = CANDLE_TOKEN_TIMEOUT + ALERT_DRAIN_TIMEOUT + 30
+
+# Per-symbol exponential backoff after failed fetches: base * 2^failures seconds (+ jitter), capped
+FAILURE_BACKOFF_BASE = 30
+FAILURE_BACKOFF_MAX = 600
+
+# One bit per level for same-candle alert deduplication
+LEVEL_BITS = {
+    LevelType.S1: 1,
+    LevelType.BC: 2,
+    LevelType.PIVOT: 4,
+    LevelType.TC: 8,
+    LevelType.R1: 16
+}
+
+# CPRLevels attribute holding each level, resolved once instead of lower-casing the enum value per lookup
+LEVEL_FIELDS = {level_type: level_type.value.lower() for level_type in LevelType}
+
+# Levels monitored for touch alerts, in alert priority order (R1 > S1 > PIVOT) so touches
+# collected from the scan rows need no sorting
+KEY_LEVELS = (LevelType.R1, LevelType.S1, LevelType.PIVOT)
+
+# Relative widening of the precomputed touch bounds so the cheap reject in scan_level_rows()
+# can never disagree with the exact tolerance test after float rounding
+LEVEL_BOUND_SLACK = 1e-9
+
+class LevelRow(NamedTuple):
+    """One level's scan data for LevelTouchDetector.scan_level_rows(), fixed for the day."""
+    level_type: LevelType
+    value: float
+    lower: float  # value - tolerance, widened by LEVEL_BOUND_SLACK
+    upper: float  # value + tolerance, widened by LEVEL_BOUND_SLACK
+    tolerance: float  # Absolute touch tolerance
+    cross_tolerance: float  # Absolute tolerance for the previous-candle crossing check
+    cross_below: float  # value - cross_tolerance
+    cross_above: float  # value + cross_tolerance
+
+LEVEL_EMOJI = {
+    LevelType.S1: '📉',
+    LevelType.R1: '🚨',
+    LevelType.PIVOT: '⚖️',
+    LevelType.BC: '🔵',
+    LevelType.TC: '🔴'
+}
+
+STARTUP_MESSAGE_TEMPLATE = (
+    "🚀 **CPR Alert Bot Started**\n\n"
+    "📅 **Startup Time:** `{startup_time}`\n"
+    "📊 **Assets Monitored:** {num_assets} stocks\n"
+    "📋 **Stock Source:** {stock_source}\n"
+    "⚡ **Resolution:** {resolution}\n"
+    "🔄 **Check Interval:** {check_interval}s\n"
+    "🕕 **Cooldown Period:** {cooldown_minutes}min\n"
+    "🎯 **Tolerance:** {tolerance}%\n\n"
+)
+
+# Major support/resistance levels get an extra line in touch alerts
+KEY_ALERT_LEVELS = frozenset((LevelType.S1, LevelType.R1))
+KEY_LEVEL_NOTE = "\n\n🎯 *Key Level Alert* - Major support/resistance"
+
+# Single-level touch alert text, specialised per level type so only per-alert values are formatted
+ALERT_HEADERS = {
+    level_type: f"{LEVEL_EMOJI.get(level_type, '🎯')} *{level_type.value} Touch Alert*"
+    for level_type in LevelType
+}
+ALERT_BODY_TEMPLATES = {
+    level_type: (
+        "\n*{name}* touched " + level_type.value + " level!\n\n"
+        "📊 *Level:* `{level:.2f}`\n"
+        "🚨 *Alert Time:* `{alert_time}` *(REAL-TIME)*\n"
+        "📅 *Data Time:* `{data_time}`\n"
+        + (KEY_LEVEL_NOTE if level_type in KEY_ALERT_LEVELS else "")
+        + "\n⏰ *Next alert for {name}:* 30 minutes"
+    )
+    for level_type in LevelType
+}
+
+@dataclass(slots=True)
 class OHLCData:
     open: float
     high: float
@@ -57,7 +169,7 @@ class OHLCData:
     volume: Optional[int] = None
     source: str = "historical"
 
-@dataclass
+@dataclass(slots=True)
 class CPRLevels:
     pivot: float
     tc: float
@@ -66,10 +178,10 @@ class CPRLevels:
     s1: float
     
     def get_level(self, level_type: LevelType) -> float:
-        return getattr(self, level_type.value.lower())
+        return getattr(self, LEVEL_FIELDS[level_type])
 
-@dataclass
-class CandleData:
+class CandleData(NamedTuple):
+    """Immutable candle built once per asset per tick from the Fyers response."""
     timestamp: int
     open: float
     high: float
@@ -79,28 +191,162 @@ class CandleData:
     datetime: datetime
     time_str: str
 
-@dataclass
+class CandleHistory:
+    """Fixed-size ring buffer of recent candle prices, stored column-wise."""
+    
+    __slots__ = ('capacity', 'highs', 'lows', 'closes', '_head', '_count')
+    
+    def __init__(self, capacity: int = 2):
+        self.capacity = capacity
+        self.highs = array('d', bytes(8 * capacity))
+        self.lows = array('d', bytes(8 * capacity))
+        self.closes = array('d', bytes(8 * capacity))
+        self._head = 0
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, candle: CandleData):
+        """Store a candle, overwriting the oldest one when full."""
+        slot = self._head
+        self.highs[slot] = candle.high
+        self.lows[slot] = candle.low
+        self.closes[slot] = candle.close
+        # Head always points at the next slot to overwrite
+        self._head = slot + 1 if slot + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+    
+    def previous(self) -> Optional[Tuple[float, float, float]]:
+        """(high, low, close) of the candle before the latest one, if any."""
+        if self._count < 2:
+            return None
+        slot = (self._head - 2) % self.capacity
+        return self.highs[slot], self.lows[slot], self.closes[slot]
+    
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+@dataclass(slots=True)
 class StockCooldown:
     """Tracks cooldown for entire stock (all levels)."""
-    last_alert_time: datetime
+    last_alert_time: datetime  # Wall-clock time, for display only
     initial_level_touched: LevelType  # First level that triggered the cooldown
+    last_alert_monotonic: float = 0.0  # time.monotonic() of the last alert, used for cooldown checks
     total_touches: int = 1
     levels_touched_during_cooldown: Dict[str, int] = field(default_factory=dict)  # Levels touched during cooldown
+    pending_total: int = 0  # Running sum of levels_touched_during_cooldown values
+
+@dataclass(slots=True)
+class CooldownStatus:
+    """Snapshot returned by AlertCooldownManager.get_cooldown_status()."""
+    in_cooldown: bool = False
+    can_alert: bool = True
+    time_remaining: Optional[timedelta] = None
+    initial_level: Optional[str] = None
+    total_touches: int = 0
+    pending_touches: int = 0
+    levels_touched_during_cooldown: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class AssetData:
     name: str
     symbol: str
     levels: CPRLevels
     source_data: OHLCData
     last_candle_timestamp: int = 0
-    alerted_levels: set = field(default_factory=set)  # For same-candle deduplication
     stock_cooldown: Optional[StockCooldown] = None  # Single cooldown for entire stock
-    alerted_levels_timestamps: Dict[str, int] = field(default_factory=dict)  # Track alert timestamps for cleanup
-    recent_candles: List[CandleData] = field(default_factory=list)  # Track recent candles for better validation
+    recent_candles: CandleHistory = field(default_factory=CandleHistory)  # Track recent candles for better validation
+    level_tolerances: Dict[LevelType, Tuple[float, float]] = field(default_factory=dict)  # (touch, cross) tolerance per level, fixed for the day
+    key_level_rows: Tuple[LevelRow, ...] = ()  # Precomputed scan rows for KEY_LEVELS
+    generation: int = 0  # Daily reset generation this asset's tracking data belongs to
+
+@dataclass(slots=True)
+class AlertJob:
+    """A touch alert handed from the monitoring loop to the Telegram sender thread."""
+    symbol: str
+    asset_name: str
+    levels_touched: List[Tuple[LevelType, float]]  # Highest priority level first
+    candle: CandleData
+    total_touches: int
+    pending_levels: List[str]
+    detected_at: datetime
+
+@dataclass(frozen=True, slots=True)
+class AssetConfig:
+    """One configured instrument; ConfigManager converts config entries to these once."""
+    symbol: str
+    name: str
 
 # --- Helper Functions and Classes ---
 
+# Default watchlist used when STOCKS_CONFIG is not set, built once at import
+DEFAULT_ASSETS = tuple(AssetConfig(symbol, name) for symbol, name in (
+    ("NSE:NIFTY50-INDEX", "NIFTY 50"),
+    ("NSE:NIFTYBANK-INDEX", "BANK NIFTY"),
+    ("NSE:FINNIFTY-INDEX", "NIFTY FINANCIAL"),
+    ("BSE:SENSEX-INDEX", "BSE SENSEX"),
+    ("NSE:RELIANCE-EQ", "RELIANCE"),
+    ("NSE:HDFCBANK-EQ", "HDFC BANK"),
+    ("NSE:ICICIBANK-EQ", "ICICI BANK"),
+    ("NSE:AXISBANK-EQ", "AXIS BANK"),
+    ("NSE:SBIN-EQ", "STATE BANK"),
+    ("NSE:KOTAKBANK-EQ", "KOTAK BANK"),
+    ("NSE:INDUSINDBK-EQ", "INDUSIND BANK"),
+    ("NSE:FEDERALBNK-EQ", "FEDERAL BANK"),
+    ("NSE:TCS-EQ", "TCS"),
+    ("NSE:INFY-EQ", "INFOSYS"),
+    ("NSE:HCLTECH-EQ", "HCL TECH"),
+    ("NSE:TECHM-EQ", "TECH MAHINDRA"),
+    ("NSE:WIPRO-EQ", "WIPRO"),
+    ("NSE:LTIM-EQ", "LTI MINDTREE"),
+    ("NSE:BAJFINANCE-EQ", "BAJAJ FINANCE"),
+    ("NSE:BAJAJFINSV-EQ", "BAJAJ FINSERV"),
+    ("NSE:SHRIRAMFIN-EQ", "SHRIRAM FINANCE"),
+    ("NSE:TATAMOTORS-EQ", "TATA MOTORS"),
+    ("NSE:M&M-EQ", "MAHINDRA"),
+    ("NSE:MARUTI-EQ", "MARUTI"),
+    ("NSE:BAJAJ-AUTO-EQ", "BAJAJ AUTO"),
+    ("NSE:EICHERMOT-EQ", "EICHER MOTORS"),
+    ("NSE:HEROMOTOCO-EQ", "HERO MOTOCORP"),
+    ("NSE:TATASTEEL-EQ", "TATA STEEL"),
+    ("NSE:JSWSTEEL-EQ", "JSW STEEL"),
+    ("NSE:HINDALCO-EQ", "HINDALCO"),
+    ("NSE:COALINDIA-EQ", "COAL INDIA"),
+    ("NSE:ONGC-EQ", "ONGC"),
+    ("NSE:IOC-EQ", "IOC"),
+    ("NSE:BPCL-EQ", "BPCL"),
+    ("NSE:ADANIENT-EQ", "ADANI ENT"),
+    ("NSE:ADANIPORTS-EQ", "ADANI PORTS"),
+    ("NSE:LT-EQ", "L&T"),
+    ("NSE:POWERGRID-EQ", "POWER GRID"),
+    ("NSE:NTPC-EQ", "NTPC"),
+    ("NSE:SUNPHARMA-EQ", "SUN PHARMA"),
+    ("NSE:DRREDDY-EQ", "DR REDDY"),
+    ("NSE:CIPLA-EQ", "CIPLA"),
+    ("NSE:DIVISLAB-EQ", "DIVI'S LAB"),
+    ("NSE:APOLLOHOSP-EQ", "APOLLO HOSP"),
+    ("NSE:HINDUNILVR-EQ", "HINDUSTAN UNILEVER"),
+    ("NSE:ITC-EQ", "ITC"),
+    ("NSE:NESTLEIND-EQ", "NESTLE"),
+    ("NSE:BRITANNIA-EQ", "BRITANNIA"),
+    ("NSE:ASIANPAINT-EQ", "ASIAN PAINTS"),
+    ("NSE:ULTRACEMC0-EQ", "ULTRATECH CEMENT"),
+    ("NSE:GRASIM-EQ", "GRASIM"),
+    ("NSE:TITAN-EQ", "TITAN"),
+    ("NSE:TRENT-EQ", "TRENT"),
+    ("NSE:BHARTIARTL-EQ", "BHARTI AIRTEL"),
+    ("NSE:BANKBARODA-EQ", "BANK OF BARODA"),
+    ("NSE:PNB-EQ", "PNB"),
+    ("NSE:CANBK-EQ", "CANARA BANK"),
+    ("NSE:IRCTC-EQ", "IRCTC"),
+    ("NSE:SAIL-EQ", "SAIL"),
+    ("NSE:ZEEL-EQ", "ZEE ENTERTAINMENT"),
+    ("NSE:VEDL-EQ", "VEDANTA")
+))
+
 class ConfigManager:
     """Manages configuration loading and validation with fallback to environment variables."""
     
@@ -116,7 +362,7 @@ class ConfigManager:
                 return ConfigManager._load_from_environment()
             
         except Exception as e:
-            logger.error(f"Error loading configuration: {e}")
+            logger.error("Error loading configuration: %s", e)
             raise
     
     @staticmethod
@@ -127,11 +373,12 @@ class ConfigManager:
                 config = json.load(f)
             
             ConfigManager._validate_config(config)
+            config['assets'] = ConfigManager._parse_assets(config['assets'])
             logger.info("Configuration loaded from JSON file")
             return config
             
         except json.JSONDecodeError as e:
-            logger.error(f"Error decoding JSON from config file: {e}")
+            logger.error("Error decoding JSON from config file: %s", e)
             raise
     
     @staticmethod
@@ -152,85 +399,23 @@ class ConfigManager:
                             symbol_part = parts[1]
                             name = ':'.join(parts[2:])  # Join remaining parts as name
                             symbol = f"{exchange}:{symbol_part}"
-                            assets.append({"symbol": symbol, "name": name})
+                            assets.append(AssetConfig(symbol, name))
                         elif len(parts) == 2:
                             # If no name provided, use symbol as name
                             exchange = parts[0]
                             symbol_part = parts[1]
                             symbol = f"{exchange}:{symbol_part}"
                             name = symbol_part.replace('-EQ', '').replace('-INDEX', '')
-                            assets.append({"symbol": symbol, "name": name})
-                logger.info(f"Loaded {len(assets)} stocks from STOCKS_CONFIG environment variable")
+                            assets.append(AssetConfig(symbol, name))
+                logger.info("Loaded %s stocks from STOCKS_CONFIG environment variable", len(assets))
             except Exception as e:
-                logger.error(f"Error parsing STOCKS_CONFIG: {e}")
+                logger.error("Error parsing STOCKS_CONFIG: %s", e)
                 assets = []
         
         # Fallback to default major stocks if no config provided or parsing failed
         if not assets:
             logger.info("Using default stock list (no STOCKS_CONFIG provided)")
-            assets = [
-                {"symbol": "NSE:NIFTY50-INDEX", "name": "NIFTY 50"},
-                {"symbol": "NSE:NIFTYBANK-INDEX", "name": "BANK NIFTY"},
-                {"symbol": "NSE:FINNIFTY-INDEX", "name": "NIFTY FINANCIAL"},
-                {"symbol": "BSE:SENSEX-INDEX", "name": "BSE SENSEX"},
-                {"symbol": "NSE:RELIANCE-EQ", "name": "RELIANCE"},
-                {"symbol": "NSE:HDFCBANK-EQ", "name": "HDFC BANK"},
-                {"symbol": "NSE:ICICIBANK-EQ", "name": "ICICI BANK"},
-                {"symbol": "NSE:AXISBANK-EQ", "name": "AXIS BANK"},
-                {"symbol": "NSE:SBIN-EQ", "name": "STATE BANK"},
-                {"symbol": "NSE:KOTAKBANK-EQ", "name": "KOTAK BANK"},
-                {"symbol": "NSE:INDUSINDBK-EQ", "name": "INDUSIND BANK"},
-                {"symbol": "NSE:FEDERALBNK-EQ", "name": "FEDERAL BANK"},
-                {"symbol": "NSE:TCS-EQ", "name": "TCS"},
-                {"symbol": "NSE:INFY-EQ", "name": "INFOSYS"},
-                {"symbol": "NSE:HCLTECH-EQ", "name": "HCL TECH"},
-                {"symbol": "NSE:TECHM-EQ", "name": "TECH MAHINDRA"},
-                {"symbol": "NSE:WIPRO-EQ", "name": "WIPRO"},
-                {"symbol": "NSE:LTIM-EQ", "name": "LTI MINDTREE"},
-                {"symbol": "NSE:BAJFINANCE-EQ", "name": "BAJAJ FINANCE"},
-                {"symbol": "NSE:BAJAJFINSV-EQ", "name": "BAJAJ FINSERV"},
-                {"symbol": "NSE:SHRIRAMFIN-EQ", "name": "SHRIRAM FINANCE"},
-                {"symbol": "NSE:TATAMOTORS-EQ", "name": "TATA MOTORS"},
-                {"symbol": "NSE:M&M-EQ", "name": "MAHINDRA"},
-                {"symbol": "NSE:MARUTI-EQ", "name": "MARUTI"},
-                {"symbol": "NSE:BAJAJ-AUTO-EQ", "name": "BAJAJ AUTO"},
-                {"symbol": "NSE:EICHERMOT-EQ", "name": "EICHER MOTORS"},
-                {"symbol": "NSE:HEROMOTOCO-EQ", "name": "HERO MOTOCORP"},
-                {"symbol": "NSE:TATASTEEL-EQ", "name": "TATA STEEL"},
-                {"symbol": "NSE:JSWSTEEL-EQ", "name": "JSW STEEL"},
-                {"symbol": "NSE:HINDALCO-EQ", "name": "HINDALCO"},
-                {"symbol": "NSE:COALINDIA-EQ", "name": "COAL INDIA"},
-                {"symbol": "NSE:ONGC-EQ", "name": "ONGC"},
-                {"symbol": "NSE:IOC-EQ", "name": "IOC"},
-                {"symbol": "NSE:BPCL-EQ", "name": "BPCL"},
-                {"symbol": "NSE:ADANIENT-EQ", "name": "ADANI ENT"},
-                {"symbol": "NSE:ADANIPORTS-EQ", "name": "ADANI PORTS"},
-                {"symbol": "NSE:LT-EQ", "name": "L&T"},
-                {"symbol": "NSE:POWERGRID-EQ", "name": "POWER GRID"},
-                {"symbol": "NSE:NTPC-EQ", "name": "NTPC"},
-                {"symbol": "NSE:SUNPHARMA-EQ", "name": "SUN PHARMA"},
-                {"symbol": "NSE:DRREDDY-EQ", "name": "DR REDDY"},
-                {"symbol": "NSE:CIPLA-EQ", "name": "CIPLA"},
-                {"symbol": "NSE:DIVISLAB-EQ", "name": "DIVI'S LAB"},
-                {"symbol": "NSE:APOLLOHOSP-EQ", "name": "APOLLO HOSP"},
-                {"symbol": "NSE:HINDUNILVR-EQ", "name": "HINDUSTAN UNILEVER"},
-                {"symbol": "NSE:ITC-EQ", "name": "ITC"},
-                {"symbol": "NSE:NESTLEIND-EQ", "name": "NESTLE"},
-                {"symbol": "NSE:BRITANNIA-EQ", "name": "BRITANNIA"},
-                {"symbol": "NSE:ASIANPAINT-EQ", "name": "ASIAN PAINTS"},
-                {"symbol": "NSE:ULTRACEMC0-EQ", "name": "ULTRATECH CEMENT"},
-                {"symbol": "NSE:GRASIM-EQ", "name": "GRASIM"},
-                {"symbol": "NSE:TITAN-EQ", "name": "TITAN"},
-                {"symbol": "NSE:TRENT-EQ", "name": "TRENT"},
-                {"symbol": "NSE:BHARTIARTL-EQ", "name": "BHARTI AIRTEL"},
-                {"symbol": "NSE:BANKBARODA-EQ", "name": "BANK OF BARODA"},
-                {"symbol": "NSE:PNB-EQ", "name": "PNB"},
-                {"symbol": "NSE:CANBK-EQ", "name": "CANARA BANK"},
-                {"symbol": "NSE:IRCTC-EQ", "name": "IRCTC"},
-                {"symbol": "NSE:SAIL-EQ", "name": "SAIL"},
-                {"symbol": "NSE:ZEEL-EQ", "name": "ZEE ENTERTAINMENT"},
-                {"symbol": "NSE:VEDL-EQ", "name": "VEDANTA"}
-            ]
+            assets = list(DEFAULT_ASSETS)
         
         config = {
             "fyers": {
@@ -258,7 +443,8 @@ class ConfigManager:
                 "focus_on_key_levels": True,
                 "min_volume_threshold": 0,
                 "enable_spam_prevention": True,
-                "strict_level_crossing": True
+                "strict_level_crossing": True,
+                "use_live_feed": False
             }
         }
         
@@ -274,7 +460,7 @@ class ConfigManager:
                 missing_vars.append(var)
         
         if missing_vars:
-            logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
+            logger.error("Missing required environment variables: %s", ', '.join(missing_vars))
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
         
         logger.info("Configuration loaded from environment variables")
@@ -301,6 +487,33 @@ class ConfigManager:
         # Validate assets
         if not config['assets']:
             raise ValueError("No assets configured")
+    
+    @staticmethod
+    def _parse_assets(entries: List[Dict[str, str]]) -> List[AssetConfig]:
+        """Convert JSON asset entries ({"symbol", "name"}) to AssetConfig; name defaults to the symbol."""
+        try:
+            return [AssetConfig(entry['symbol'], entry.get('name') or entry['symbol']) for entry in entries]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid asset entry in config: {e}")
+
+@lru_cache(maxsize=8)
+def _parse_market_hours(start: str, end: str, pre: str, post: str) -> Tuple[Any, Any, Any, Any]:
+    """Parses market-hour strings once; repeated lookups hit the cache."""
+    return tuple(datetime.strptime(value, '%H:%M').time() for value in (start, end, pre, post))
+
+@lru_cache(maxsize=16)
+def _previous_trading_day(reference_date: date) -> date:
+    """Cached weekend-aware lookup; only logs when a new reference date is computed."""
+    previous_day = reference_date - timedelta(days=1)
+    
+    # Handle weekends
+    if reference_date.weekday() == 0:  # Monday
+        previous_day = reference_date - timedelta(days=3)  # Friday
+    elif reference_date.weekday() == 6:  # Sunday
+        previous_day = reference_date - timedelta(days=2)  # Friday
+    
+    logger.info("Reference: %s, Previous trading day: %s", reference_date, previous_day)
+    return previous_day
 
 class DateHelper:
     """Helper class for date-related operations."""
@@ -311,25 +524,27 @@ class DateHelper:
         if reference_date is None:
             reference_date = date.today()
         
-        previous_day = reference_date - timedelta(days=1)
-        
-        # Handle weekends
-        if reference_date.weekday() == 0:  # Monday
-            previous_day = reference_date - timedelta(days=3)  # Friday
-        elif reference_date.weekday() == 6:  # Sunday
-            previous_day = reference_date - timedelta(days=2)  # Friday
-        
-        logger.info(f"Reference: {reference_date}, Previous trading day: {previous_day}")
-        return previous_day
+        return _previous_trading_day(reference_date)
+    
+    @staticmethod
+    def next_daily_run(at: str, now: Optional[datetime] = None) -> float:
+        """Epoch seconds of the next occurrence of an HH:MM wall-clock time."""
+        now = now or datetime.now()
+        hour, minute = map(int, at.split(':'))
+        run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if run_at <= now:
+            run_at += timedelta(days=1)
+        return run_at.timestamp()
 
     @staticmethod
     def is_market_time(current_time: time, market_hours: Dict[str, str]) -> MarketStatus:
         """Determines current market status."""
-        start_time = datetime.strptime(market_hours['start'], '%H:%M').time()
-        end_time = datetime.strptime(market_hours['end'], '%H:%M').time()
-        
-        pre_market_start = datetime.strptime(market_hours.get('pre_market_start', '09:00'), '%H:%M').time()
-        post_market_end = datetime.strptime(market_hours.get('post_market_end', '15:45'), '%H:%M').time()
+        start_time, end_time, pre_market_start, post_market_end = _parse_market_hours(
+            market_hours['start'],
+            market_hours['end'],
+            market_hours.get('pre_market_start', '09:00'),
+            market_hours.get('post_market_end', '15:45')
+        )
         
         if start_time <= current_time <= end_time:
             return MarketStatus.OPEN
@@ -365,35 +580,44 @@ class LevelTouchDetector:
     
     def __init__(self, tolerance_percent: float = 0.25):  # Increased default from 0.1% to 0.25%
         self.tolerance_percent = tolerance_percent
-        logger.info(f"LevelTouchDetector initialized with {tolerance_percent}% tolerance")
+        # Relative tolerances as multipliers of the level value; touches are capped at 0.05%
+        self._tol_factor = min(tolerance_percent, 0.05) / 100
+        self._strict_tol_factor = 0.02 / 100
+        logger.info("LevelTouchDetector initialized with %s%% tolerance", tolerance_percent)
         
         # Warn if tolerance is too sensitive
         if tolerance_percent < 0.15:
-            logger.warning(f"⚠️ Tolerance {tolerance_percent}% is very sensitive and may cause spam alerts")
+            logger.warning("⚠️ Tolerance %s%% is very sensitive and may cause spam alerts", tolerance_percent)
     
     def check_level_touch(self, candle: CandleData, level_value: float) -> bool:
         """Check if a candle actually touched/crossed a specific level with minimal tolerance."""
         if not candle:
             return False
         
-        actual_tolerance_percent = min(self.tolerance_percent, 0.05)
-        tolerance = level_value * (actual_tolerance_percent / 100)
+        low = candle.low
+        high = candle.high
+        tolerance = level_value * self._tol_factor
         
-        level_touched = (candle.low - tolerance) <= level_value <= (candle.high + tolerance)
+        # Reject levels outside the candle widened by the touch tolerance before the
+        # significance math; abs() keeps the band the right way round for any sign
+        band = abs(tolerance)
+        if level_value < low - band or level_value > high + band:
+            return False
         
-        if level_touched:
-            candle_range = candle.high - candle.low
-            touch_significance = min(abs(candle.low - level_value), abs(candle.high - level_value))
-            
-            return touch_significance <= tolerance and candle_range > tolerance * 2
+        candle_range = high - low
+        touch_significance = min(abs(low - level_value), abs(high - level_value))
         
-        return False
+        return touch_significance <= tolerance and candle_range > tolerance * 2
     
     def check_level_touch_with_filters(self, candle: CandleData, level_value: float, 
-                                     recent_candles: List[CandleData] = None, 
+                                     recent_candles: Optional[CandleHistory] = None, 
                                      min_volume: int = 0, 
                                      level_type: str = None) -> bool:
-        """Enhanced level touch detection with spam filters and directional validation."""
+        """Enhanced level touch detection with spam filters and directional validation.
+        
+        ``recent_candles`` must already contain ``candle`` as its latest entry; the
+        candle before it is used for crossing validation.
+        """
         if not self.check_level_touch(candle, level_value):
             return False
         
@@ -401,39 +625,129 @@ class LevelTouchDetector:
         # Volatility filter - REMOVED (no longer required)
         
         # Strict level crossing validation
-        if level_type and recent_candles and len(recent_candles) > 0:
-            prev_candle = recent_candles[-1]
+        if level_type and recent_candles is not None:
+            previous = recent_candles.previous()
             
-            if not self.check_actual_level_cross(candle, prev_candle, level_value, level_type):
+            if previous and not self.check_actual_level_cross(candle, previous, level_value, level_type):
                 return False
         
         return True
     
-    def check_actual_level_cross(self, current_candle: CandleData, previous_candle: CandleData, 
+    def check_actual_level_cross(self, current_candle: CandleData, previous: Tuple[float, float, float], 
                                 level_value: float, level_type: str) -> bool:
-        """Check if price actually crossed the level, not just came close."""
-        if not previous_candle:
+        """Check if price actually crossed the level, not just came close.
+        
+        ``previous`` is the (high, low, close) of the preceding candle.
+        """
+        if not previous:
             return False
         
-        tolerance = level_value * 0.02 / 100
+        prev_high, prev_low, prev_close = previous
+        tolerance = level_value * self._strict_tol_factor
         
         if level_type == 'S1':
-            prev_above = previous_candle.low > (level_value + tolerance)
+            prev_above = prev_low > (level_value + tolerance)
             curr_touches = (current_candle.low - tolerance) <= level_value <= (current_candle.high + tolerance)
             return prev_above and curr_touches
             
         elif level_type == 'R1':
-            prev_below = previous_candle.high < (level_value - tolerance)
+            prev_below = prev_high < (level_value - tolerance)
             curr_touches = (current_candle.low - tolerance) <= level_value <= (current_candle.high + tolerance)
             return prev_below and curr_touches
             
         elif level_type == 'PIVOT':
-            prev_above = previous_candle.close > (level_value + tolerance)
-            prev_below = previous_candle.close < (level_value - tolerance)
+            prev_above = prev_close > (level_value + tolerance)
+            prev_below = prev_close < (level_value - tolerance)
             curr_touches = (current_candle.low - tolerance) <= level_value <= (current_candle.high + tolerance)
             return (prev_above or prev_below) and curr_touches
         
         return False
+    
+    def level_tolerances(self, levels: CPRLevels) -> Dict[LevelType, Tuple[float, float]]:
+        """Absolute (touch, cross) tolerances for every level; constant for a trading day."""
+        tolerances = {}
+        for level_type in LevelType:
+            level_value = levels.get_level(level_type)
+            tolerances[level_type] = (level_value * self._tol_factor, level_value * self._strict_tol_factor)
+        return tolerances
+    
+    def level_rows(self, levels: CPRLevels, level_types, 
+                   tolerances: Optional[Dict[LevelType, Tuple[float, float]]] = None
+                   ) -> Tuple[LevelRow, ...]:
+        """Build LevelRow entries for scan_level_rows()."""
+        if not tolerances:
+            tolerances = self.level_tolerances(levels)
+        rows = []
+        for level_type in level_types:
+            level_value = levels.get_level(level_type)
+            tolerance, cross_tolerance = tolerances[level_type]
+            slack = abs(level_value) * LEVEL_BOUND_SLACK
+            rows.append(LevelRow(
+                level_type=level_type,
+                value=level_value,
+                lower=level_value - tolerance - slack,
+                upper=level_value + tolerance + slack,
+                tolerance=tolerance,
+                cross_tolerance=cross_tolerance,
+                cross_below=level_value - cross_tolerance,
+                cross_above=level_value + cross_tolerance
+            ))
+        return tuple(rows)
+    
+    def scan_touches(self, candle: CandleData, levels: CPRLevels, 
+                     recent_candles: Optional[CandleHistory], level_types, 
+                     tolerances: Optional[Dict[LevelType, Tuple[float, float]]] = None) -> int:
+        """Single pass over ``level_types`` applying the touch and crossing checks.
+        
+        Equivalent to calling check_level_touch_with_filters() per level, but reads
+        the candle and previous candle once. ``tolerances`` comes from
+        level_tolerances() and is computed here if not supplied. Returns a
+        LEVEL_BITS mask of touched levels.
+        """
+        return self.scan_level_rows(candle, self.level_rows(levels, level_types, tolerances), recent_candles)
+    
+    @staticmethod
+    def scan_level_rows(candle: CandleData, rows: Tuple[LevelRow, ...], 
+                        recent_candles: Optional[CandleHistory]) -> int:
+        """scan_touches() over rows from level_rows(), so nothing is looked up per tick."""
+        low = candle.low
+        high = candle.high
+        previous = None
+        mask = 0
+        
+        for (level_type, level_value, lower, upper, tolerance, cross_tolerance,
+             cross_below, cross_above) in rows:
+            # Precomputed bounds reject quiet candles without any arithmetic
+            if low > upper or high < lower:
+                continue
+            
+            # check_level_touch
+            if not (low - tolerance) <= level_value <= (high + tolerance):
+                continue
+            if min(abs(low - level_value), abs(high - level_value)) > tolerance or high - low <= tolerance * 2:
+                continue
+            
+            # check_actual_level_cross
+            if previous is None and recent_candles is not None:
+                previous = recent_candles.previous() or ()
+            if previous:
+                prev_high, prev_low, prev_close = previous
+                if not (low - cross_tolerance) <= level_value <= (high + cross_tolerance):
+                    continue
+                if level_type is LevelType.S1:
+                    crossed = prev_low > cross_above
+                elif level_type is LevelType.R1:
+                    crossed = prev_high < cross_below
+                elif level_type is LevelType.PIVOT:
+                    crossed = prev_close > cross_above or prev_close < cross_below
+                else:
+                    crossed = False
+                if not crossed:
+                    continue
+            
+            mask |= LEVEL_BITS[level_type]
+        
+        return mask
 
 class AlertCooldownManager:
     """Manages stock-wide cooldown periods for level touch alerts."""
@@ -441,42 +755,55 @@ class AlertCooldownManager:
     def __init__(self, cooldown_minutes: int = 30):  # Increased from 15 to 30 minutes
         # Ensure minimum cooldown to prevent spam
         self.cooldown_minutes = max(cooldown_minutes, 20)  # Minimum 20 minutes
-        self.cooldown_duration = timedelta(minutes=self.cooldown_minutes)
+        self.cooldown_seconds = self.cooldown_minutes * 60
         
         if self.cooldown_minutes != cooldown_minutes:
-            logger.info(f"AlertCooldownManager cooldown adjusted from {cooldown_minutes} to {self.cooldown_minutes} minutes (spam prevention)")
+            logger.info("AlertCooldownManager cooldown adjusted from %s to %s minutes (spam prevention)", cooldown_minutes, self.cooldown_minutes)
         else:
-            logger.info(f"AlertCooldownManager initialized with {self.cooldown_minutes} minute STOCK-WIDE cooldown")
+            logger.info("AlertCooldownManager initialized with %s minute STOCK-WIDE cooldown", self.cooldown_minutes)
         
         # Warn if cooldown is too short
         if self.cooldown_minutes < 25:
-            logger.warning(f"⚠️ Cooldown {self.cooldown_minutes}min may still allow spam alerts. Recommended: 30min+")
+            logger.warning("⚠️ Cooldown %smin may still allow spam alerts. Recommended: 30min+", self.cooldown_minutes)
+        
+        # Assets with at least one alert today, keyed by symbol, so reports skip idle assets
+        self.active_assets: Dict[str, AssetData] = {}
     
-    def can_send_alert(self, asset_data: AssetData, level_type: LevelType, current_time: datetime) -> bool:
+    def can_send_alert(self, asset_data: AssetData, level_type: LevelType, 
+                       now_monotonic: Optional[float] = None) -> bool:
         """Check if we can send an alert for this stock (any level)."""
         if asset_data.stock_cooldown is None:
             return True
         
-        time_since_last_alert = current_time - asset_data.stock_cooldown.last_alert_time
-        return time_since_last_alert >= self.cooldown_duration
+        if now_monotonic is None:
+            now_monotonic = time.monotonic()
+        return (now_monotonic - asset_data.stock_cooldown.last_alert_monotonic) >= self.cooldown_seconds
     
-    def record_alert_sent(self, asset_data: AssetData, level_type: LevelType, current_time: datetime):
+    def record_alert_sent(self, asset_data: AssetData, level_type: LevelType, current_time: datetime, 
+                          now_monotonic: Optional[float] = None):
         """Record that an alert was sent for this stock."""
+        if now_monotonic is None:
+            now_monotonic = time.monotonic()
+        
         if asset_data.stock_cooldown is None:
             # First alert for this stock
+            self.active_assets[asset_data.symbol] = asset_data
             asset_data.stock_cooldown = StockCooldown(
                 last_alert_time=current_time,
                 initial_level_touched=level_type,
+                last_alert_monotonic=now_monotonic,
                 total_touches=1,
                 levels_touched_during_cooldown={}
             )
         else:
             # Update existing cooldown - this means cooldown period has expired
-            pending_touches = sum(asset_data.stock_cooldown.levels_touched_during_cooldown.values())
+            pending_touches = asset_data.stock_cooldown.pending_total
             asset_data.stock_cooldown.last_alert_time = current_time
+            asset_data.stock_cooldown.last_alert_monotonic = now_monotonic
             asset_data.stock_cooldown.initial_level_touched = level_type
             asset_data.stock_cooldown.total_touches += 1 + pending_touches
             asset_data.stock_cooldown.levels_touched_during_cooldown.clear()
+            asset_data.stock_cooldown.pending_total = 0
     
     def record_touch_during_cooldown(self, asset_data: AssetData, level_type: LevelType):
         """Record a touch that occurred during cooldown period."""
@@ -484,70 +811,124 @@ class AlertCooldownManager:
             level_key = level_type.value
             current_count = asset_data.stock_cooldown.levels_touched_during_cooldown.get(level_key, 0)
             asset_data.stock_cooldown.levels_touched_during_cooldown[level_key] = current_count + 1
+            asset_data.stock_cooldown.pending_total += 1
     
-    def get_cooldown_status(self, asset_data: AssetData, current_time: datetime) -> Dict[str, Any]:
+    def get_cooldown_status(self, asset_data: AssetData, 
+                            now_monotonic: Optional[float] = None) -> CooldownStatus:
         """Get detailed cooldown status for this stock."""
         if asset_data.stock_cooldown is None:
-            return {"in_cooldown": False, "can_alert": True}
+            return CooldownStatus()
         
-        time_until_next = self.get_time_until_next_alert(asset_data, current_time)
+        time_until_next = self.get_time_until_next_alert(asset_data, now_monotonic)
         pending_touches, levels_touched = self.get_pending_touches_summary(asset_data)
         
-        return {
-            "in_cooldown": time_until_next is not None,
-            "can_alert": time_until_next is None,
-            "time_remaining": time_until_next,
-            "initial_level": asset_data.stock_cooldown.initial_level_touched.value,
-            "total_touches": self.get_total_touches(asset_data),
-            "pending_touches": pending_touches,
-            "levels_touched_during_cooldown": levels_touched
-        }
+        return CooldownStatus(
+            in_cooldown=time_until_next is not None,
+            can_alert=time_until_next is None,
+            time_remaining=time_until_next,
+            initial_level=asset_data.stock_cooldown.initial_level_touched.value,
+            total_touches=self.get_total_touches(asset_data),
+            pending_touches=pending_touches,
+            levels_touched_during_cooldown=levels_touched
+        )
     
     def get_total_touches(self, asset_data: AssetData) -> int:
         """Get total touches for this stock today."""
         if asset_data.stock_cooldown is None:
             return 0
         
-        pending_touches = sum(asset_data.stock_cooldown.levels_touched_during_cooldown.values())
-        return asset_data.stock_cooldown.total_touches + pending_touches
+        return asset_data.stock_cooldown.total_touches + asset_data.stock_cooldown.pending_total
     
     def get_pending_touches_summary(self, asset_data: AssetData) -> Tuple[int, List[str]]:
         """Get summary of pending touches during cooldown."""
         if asset_data.stock_cooldown is None:
             return 0, []
         
-        total_pending = sum(asset_data.stock_cooldown.levels_touched_during_cooldown.values())
+        total_pending = asset_data.stock_cooldown.pending_total
         levels_touched = list(asset_data.stock_cooldown.levels_touched_during_cooldown.keys())
         
         return total_pending, levels_touched
     
-    def get_time_until_next_alert(self, asset_data: AssetData, current_time: datetime) -> Optional[timedelta]:
-        """Get time remaining until next alert can be sent for this stock."""
+    def get_time_until_next_alert(self, asset_data: AssetData, 
+                                  now_monotonic: Optional[float] = None) -> Optional[timedelta]:
+        """Get time remaining until next alert can be sent for this stock.
+        
+        Uses the same monotonic clock as can_send_alert(); the timedelta is only
+        built while the stock is actually in cooldown.
+        """
         if asset_data.stock_cooldown is None:
             return None
         
-        time_since_last = current_time - asset_data.stock_cooldown.last_alert_time
+        if now_monotonic is None:
+            now_monotonic = time.monotonic()
+        remaining = self.cooldown_seconds - (now_monotonic - asset_data.stock_cooldown.last_alert_monotonic)
         
-        if time_since_last >= self.cooldown_duration:
+        if remaining <= 0:
             return None
         
-        return self.cooldown_duration - time_since_last
+        return timedelta(seconds=remaining)
     
     def reset_daily_cooldowns(self, asset_data: AssetData):
         """Reset cooldown for a new trading day."""
         asset_data.stock_cooldown = None
+        if self.active_assets.get(asset_data.symbol) is asset_data:
+            del self.active_assets[asset_data.symbol]
+
+DAILY_LEVELS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        date TEXT NOT NULL,
+        pivot REAL NOT NULL,
+        tc REAL NOT NULL,
+        bc REAL NOT NULL,
+        r1 REAL NOT NULL,
+        s1 REAL NOT NULL,
+        src_open REAL,
+        src_high REAL,
+        src_low REAL,
+        src_close REAL,
+        src_volume INTEGER,
+        src_source TEXT,
+        UNIQUE(symbol, date)
+    )
+'''
+
+DAILY_LEVELS_INSERT = '''
+    INSERT OR REPLACE INTO {table}
+    (symbol, date, pivot, tc, bc, r1, s1,
+     src_open, src_high, src_low, src_close, src_volume, src_source)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+OHLC_CACHE_TTL_DAYS = 90  # Completed daily bars never change, so they can be kept for a long time
 
 class DatabaseService:
     """Handles database operations for storing alerts and historical data."""
     
-    def __init__(self, db_path: Path = DB_FILE):
+    def __init__(self, db_path: Path = DB_FILE, flush_rows: int = 20, flush_interval_seconds: float = 30):
         self.db_path = db_path
+        self.flush_rows = flush_rows
+        self.flush_interval_seconds = flush_interval_seconds
+        self._alert_buffer: List[Tuple[str, str, float, float, int, str]] = []
+        self._daily_cache: Dict[Tuple[str, str], Tuple[float, float, float, float, float]] = {}  # Last levels written per (symbol, date)
+        self._last_flush = time.monotonic()
+        self._db_lock = Lock()
+        # Single long-lived connection; transactions are managed explicitly and only plain
+        # ints/floats/strs are bound, so no type adapters or converters are involved
+        self._conn = sqlite3.connect(self.db_path, detect_types=0, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute('PRAGMA cache_size=-64000')  # Up to 64MB page cache; pages are only allocated as used
+        self._conn.execute('PRAGMA busy_timeout=5000')  # Wait out writers from other processes instead of failing
         self._init_database()
     
     def _init_database(self):
         """Initialize database tables."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
+        with self._db_lock:
+            self._conn.execute('''
                 CREATE TABLE IF NOT EXISTS alerts (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     symbol TEXT NOT NULL,
@@ -560,55 +941,170 @@ class DatabaseService:
                 )
             ''')
             
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS daily_levels (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+            self._conn.execute(DAILY_LEVELS_SCHEMA.format(table='daily_levels'))
+            self._migrate_daily_levels()
+            
+            # Completed daily bars keyed by the requested trading day
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS ohlc_cache (
                     symbol TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    pivot REAL NOT NULL,
-                    tc REAL NOT NULL,
-                    bc REAL NOT NULL,
-                    r1 REAL NOT NULL,
-                    s1 REAL NOT NULL,
-                    source_ohlc TEXT NOT NULL,
-                    UNIQUE(symbol, date)
+                    target_date TEXT NOT NULL,
+                    bar_date TEXT NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    volume INTEGER,
+                    source TEXT NOT NULL,
+                    cached_at REAL NOT NULL,
+                    PRIMARY KEY (symbol, target_date)
                 )
             ''')
     
+    def _migrate_daily_levels(self):
+        """Convert a legacy daily_levels table (JSON source_ohlc column) to scalar source columns."""
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(daily_levels)')}
+        if 'source_ohlc' not in columns:
+            return
+        
+        rows = []
+        skipped = 0
+        for row in self._conn.execute(
+                'SELECT symbol, date, pivot, tc, bc, r1, s1, source_ohlc FROM daily_levels'):
+            try:
+                source = json.loads(row[7])
+                rows.append(row[:7] + (source.get('open'), source.get('high'), source.get('low'),
+                                       source.get('close'), source.get('volume'), source.get('source')))
+            except (TypeError, ValueError, AttributeError) as e:
+                # Levels are recomputed daily, so a bad legacy row is dropped rather than blocking start-up
+                logger.warning("Skipping daily_levels row %s %s with unreadable source_ohlc: %s", row[0], row[1], e)
+                skipped += 1
+        
+        self._conn.execute('BEGIN')
+        try:
+            self._conn.execute(DAILY_LEVELS_SCHEMA.format(table='daily_levels_new'))
+            self._conn.executemany(DAILY_LEVELS_INSERT.format(table='daily_levels_new'), rows)
+            self._conn.execute('DROP TABLE daily_levels')
+            self._conn.execute('ALTER TABLE daily_levels_new RENAME TO daily_levels')
+            self._conn.execute('COMMIT')
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+        logger.info("Migrated %s daily_levels rows to scalar source columns (%s skipped)", len(rows), skipped)
+    
     def save_alert(self, symbol: str, level_type: str, level_value: float, 
                    touch_price: float, timestamp: int):
-        """Save an alert to the database."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
+        """Buffer an alert; rows are written in batches by flush_alerts()."""
+        with self._db_lock:
+            self._alert_buffer.append((symbol, level_type, level_value, touch_price, int(timestamp),
+                                       datetime.now().isoformat()))
+            should_flush = (len(self._alert_buffer) >= self.flush_rows or
+                            time.monotonic() - self._last_flush >= self.flush_interval_seconds)
+        
+        if should_flush:
+            self.flush_alerts()
+    
+    def flush_alerts(self):
+        """Write all buffered alerts in a single transaction."""
+        with self._db_lock:
+            self._last_flush = time.monotonic()
+            if not self._alert_buffer:
+                return
+            
+            rows = self._alert_buffer
+            self._alert_buffer = []
+            try:
+                self._conn.execute('BEGIN')
+                self._conn.executemany('''
                     INSERT OR IGNORE INTO alerts 
                     (symbol, level_type, level_value, touch_price, timestamp, date_sent)
                     VALUES (?, ?, ?, ?, ?, ?)
-                ''', (symbol, level_type, level_value, touch_price, timestamp, 
-                      datetime.now().isoformat()))
-        except Exception as e:
-            logger.error(f"Error saving alert: {e}")
+                ''', rows)
+                self._conn.execute('COMMIT')
+            except Exception as e:
+                if self._conn.in_transaction:
+                    self._conn.execute('ROLLBACK')
+                logger.error("Error saving %s alerts: %s", len(rows), e)
     
     def save_daily_levels(self, symbol: str, date_str: str, levels: CPRLevels, 
                          source_ohlc: OHLCData):
-        """Save daily CPR levels to the database."""
+        """Save daily CPR levels to the database, skipping unchanged re-runs."""
+        self.save_daily_levels_bulk(date_str, [(symbol, levels, source_ohlc)])
+    
+    def save_daily_levels_bulk(self, date_str: str, 
+                               entries: List[Tuple[str, CPRLevels, OHLCData]]):
+        """Save (symbol, levels, source_ohlc) entries in one transaction, skipping unchanged re-runs."""
+        rows = []
+        for symbol, levels, source_ohlc in entries:
+            values = (levels.pivot, levels.tc, levels.bc, levels.r1, levels.s1)
+            if self._daily_cache.get((symbol, date_str)) == values:
+                continue
+            rows.append((
+                symbol, date_str, *values,
+                source_ohlc.open, source_ohlc.high, source_ohlc.low, source_ohlc.close,
+                source_ohlc.volume, source_ohlc.source
+            ))
+        if not rows:
+            return
+        
+        try:
+            with self._db_lock:
+                self._conn.execute('BEGIN')
+                try:
+                    self._conn.executemany(DAILY_LEVELS_INSERT.format(table='daily_levels'), rows)
+                    self._conn.execute('COMMIT')
+                except Exception:
+                    self._conn.execute('ROLLBACK')
+                    raise
+        except Exception as e:
+            logger.error("Error saving daily levels: %s", e)
+            return
+        
+        if len(self._daily_cache) + len(rows) > 1024:  # Bounded: only the current day's entries matter
+            self._daily_cache.clear()
+        for row in rows:
+            self._daily_cache[(row[0], date_str)] = row[2:7]
+    
+    def get_cached_ohlc(self, symbol: str, target_date: date) -> Optional[OHLCData]:
+        """Return a previously fetched daily bar for a past trading day, if still fresh."""
+        if target_date >= date.today():
+            return None
+        
+        min_cached_at = time.time() - OHLC_CACHE_TTL_DAYS * 86400
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
-                    INSERT OR REPLACE INTO daily_levels 
-                    (symbol, date, pivot, tc, bc, r1, s1, source_ohlc)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (symbol, date_str, levels.pivot, levels.tc, levels.bc, 
-                      levels.r1, levels.s1, json.dumps({
-                          'open': source_ohlc.open,
-                          'high': source_ohlc.high,
-                          'low': source_ohlc.low,
-                          'close': source_ohlc.close,
-                          'volume': source_ohlc.volume,
-                          'source': source_ohlc.source
-                      })))
+            with self._db_lock:
+                row = self._conn.execute('''
+                    SELECT bar_date, open, high, low, close, volume, source FROM ohlc_cache
+                    WHERE symbol = ? AND target_date = ? AND cached_at >= ?
+                ''', (symbol, target_date.isoformat(), min_cached_at)).fetchone()
         except Exception as e:
-            logger.error(f"Error saving daily levels: {e}")
+            logger.error("Error reading OHLC cache for %s: %s", symbol, e)
+            return None
+        
+        if row is None:
+            return None
+        bar_date, o, h, l, c, volume, source = row
+        return OHLCData(open=o, high=h, low=l, close=c, date=date.fromisoformat(bar_date),
+                        volume=volume, source=source)
+    
+    def cache_ohlc(self, symbol: str, target_date: date, ohlc: OHLCData):
+        """Store a completed historical daily bar; quote estimates and today's data are not cached."""
+        if ohlc.source != "historical" or target_date >= date.today():
+            return
+        
+        now = time.time()
+        try:
+            with self._db_lock:
+                self._conn.execute('''
+                    INSERT OR REPLACE INTO ohlc_cache
+                    (symbol, target_date, bar_date, open, high, low, close, volume, source, cached_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (symbol, target_date.isoformat(), ohlc.date.isoformat(), ohlc.open, ohlc.high,
+                      ohlc.low, ohlc.close, ohlc.volume, ohlc.source, now))
+                self._conn.execute('DELETE FROM ohlc_cache WHERE cached_at < ?',
+                                   (now - OHLC_CACHE_TTL_DAYS * 86400,))
+        except Exception as e:
+            logger.error("Error caching OHLC for %s: %s", symbol, e)
 
 class TelegramService:
     """Enhanced Telegram service with retry logic and rate limiting."""
@@ -617,65 +1113,83 @@ class TelegramService:
         self.bot_token = config.get('bot_token')
         self.chat_id = config.get('chat_id')
         self.base_url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-        self.last_message_time = 0
+        # Rate-limit bookkeeping uses time.monotonic() so wall-clock jumps don't affect it
+        self.last_message_time = float('-inf')
         self.min_interval = 5
         self.burst_count = 0
-        self.burst_window_start = 0
+        self.burst_window_start = float('-inf')
         self.max_burst_messages = 3
         self.burst_window_seconds = 60
+        # The alert sender thread and the monitoring thread (daily summary) both send
+        self._send_lock = Lock()
         
         if not self.bot_token or not self.chat_id:
             raise ValueError("Telegram bot_token or chat_id is missing in config.")
+        
+        # Persistent session keeps the HTTPS connection to Telegram alive between alerts.
+        # Retries are handled in send_alert, so the adapter itself never retries.
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
 
     def send_alert(self, message: str, max_retries: int = 3) -> bool:
         """Sends a message with retry logic and enhanced rate limiting."""
-        current_time = time.time()
+        # One send at a time, so the rate-limit bookkeeping and spacing hold across threads
+        with self._send_lock:
+            return self._send_alert(message, max_retries)
+    
+    def _send_alert(self, message: str, max_retries: int) -> bool:
+        """send_alert() body; the caller holds _send_lock."""
+        now = time.monotonic()
         
-        if current_time - self.burst_window_start > self.burst_window_seconds:
-            self.burst_window_start = current_time
+        if now - self.burst_window_start > self.burst_window_seconds:
+            self.burst_window_start = now
             self.burst_count = 0
         
         if self.burst_count >= self.max_burst_messages:
-            logger.warning(f"Telegram rate limit: {self.burst_count} messages sent in {self.burst_window_seconds}s window")
+            logger.warning("Telegram rate limit: %s messages sent in %ss window", self.burst_count, self.burst_window_seconds)
             return False
         
-        time_since_last = current_time - self.last_message_time
+        time_since_last = now - self.last_message_time
         if time_since_last < self.min_interval:
             time.sleep(self.min_interval - time_since_last)
         
         # Try with Markdown first, then fallback to plain text
+        markdown_payload = {
+            'chat_id': self.chat_id,
+            'text': message[:4096],
+            'parse_mode': 'Markdown'
+        }
+        plain_payload = None
+        
         for attempt in range(max_retries):
             try:
                 # First attempt with Markdown
                 if attempt == 0:
-                    payload = {
-                        'chat_id': self.chat_id,
-                        'text': message[:4096],
-                        'parse_mode': 'Markdown'
-                    }
+                    payload = markdown_payload
                 else:
-                    # Fallback: Remove markdown formatting and send as plain text
-                    clean_message = self._clean_markdown(message)
-                    payload = {
-                        'chat_id': self.chat_id,
-                        'text': clean_message[:4096]
-                        # No parse_mode for plain text
-                    }
+                    # Fallback: Remove markdown formatting and send as plain text (built once)
+                    if plain_payload is None:
+                        plain_payload = {
+                            'chat_id': self.chat_id,
+                            'text': self._clean_markdown(message)[:4096]
+                            # No parse_mode for plain text
+                        }
+                    payload = plain_payload
                 
-                response = requests.post(self.base_url, data=payload, timeout=10)
+                response = self._session.post(self.base_url, json=payload, timeout=10)
                 response.raise_for_status()
-                self.last_message_time = time.time()
+                self.last_message_time = time.monotonic()
                 self.burst_count += 1
                 parse_mode = "Markdown" if attempt == 0 else "Plain Text"
-                logger.info(f"Alert sent successfully (attempt {attempt + 1}, {parse_mode})")
+                logger.info("Alert sent successfully (attempt %s, %s)", attempt + 1, parse_mode)
                 return True
                 
             except requests.exceptions.RequestException as e:
-                logger.warning(f"Failed to send alert (attempt {attempt + 1}): {e}")
+                logger.warning("Failed to send alert (attempt %s): %s", attempt + 1, e)
                 if attempt < max_retries - 1:
                     time.sleep(2 ** attempt)
         
-        logger.error(f"Failed to send alert after {max_retries} attempts")
+        logger.error("Failed to send alert after %s attempts", max_retries)
         return False
     
     def _clean_markdown(self, text: str) -> str:
@@ -690,47 +1204,169 @@ class TelegramService:
 
     def send_formatted_alert(self, asset_name: str, level_type: LevelType, 
                            level_value: float, candle: CandleData, 
-                           total_touches: int = 1, pending_levels: List[str] = None) -> bool:
+                           total_touches: int = 1, pending_levels: List[str] = None,
+                           detection_time: Optional[datetime] = None) -> bool:
         """Sends a formatted level touch alert with real-time detection info."""
-        emoji_map = {
-            LevelType.S1: '📉',
-            LevelType.R1: '🚨',
-            LevelType.PIVOT: '⚖️',
-            LevelType.BC: '🔵',
-            LevelType.TC: '🔴'
-        }
-        
-        emoji = emoji_map.get(level_type, '🎯')
+        # Detection time comes from the monitoring tick when given, otherwise now
+        detection_time = detection_time or datetime.now()
         
-        # Get current real time for instant detection
-        detection_time = datetime.now()
-        
-        # Create main alert message
-        message = f"{emoji} *{level_type.value} Touch Alert*"
-        
-        # Add touch count information
+        # Header: touch count and other levels touched during cooldown are optional
+        parts = [ALERT_HEADERS[level_type]]
         if total_touches > 1:
-            message += f" *(Touch #{total_touches})*"
-        
-        # Add information about other levels touched during cooldown
-        if pending_levels and len(pending_levels) > 0:
-            levels_str = ", ".join(pending_levels)
-            message += f" *[Also: {levels_str}]*"
-        
-        message += f"\n*{asset_name}* touched {level_type.value} level!\n\n"
-        message += f"📊 *Level:* `{level_value:.2f}`\n"
-        message += f"🚨 *Alert Time:* `{detection_time.strftime('%H:%M:%S')}` *(REAL-TIME)*\n"
-        message += f"📅 *Data Time:* `{candle.time_str}`\n"
+            parts.append(f" *(Touch #{total_touches})*")
+        if pending_levels:
+            parts.append(f" *[Also: {', '.join(pending_levels)}]*")
+        
+        # Body, key-level note and cooldown line come from the level's template
+        parts.append(ALERT_BODY_TEMPLATES[level_type].format(
+            name=asset_name,
+            level=level_value,
+            alert_time=detection_time.strftime('%H:%M:%S'),
+            data_time=candle.time_str
+        ))
+        
+        return self.send_alert("".join(parts))
+    
+    def send_multi_level_alert(self, asset_name: str, levels_touched: List[Tuple[LevelType, float]], 
+                               candle: CandleData, total_touches: int = 1, 
+                               pending_levels: List[str] = None,
+                               detection_time: Optional[datetime] = None) -> bool:
+        """Sends one alert for every level a candle touched; the first entry is the primary level."""
+        if len(levels_touched) == 1:
+            level_type, level_value = levels_touched[0]
+            return self.send_formatted_alert(asset_name, level_type, level_value, candle,
+                                             total_touches, pending_levels, detection_time)
+        
+        primary_type = levels_touched[0][0]
+        emoji = LEVEL_EMOJI.get(primary_type, '🎯')
+        level_names = [level_type.value for level_type, _ in levels_touched]
+        detection_time = detection_time or datetime.now()
+        
+        parts = [f"{emoji} *{' + '.join(level_names)} Touch Alert*"]
+        if total_touches > 1:
+            parts.append(f" *(Touch #{total_touches})*")
+        if pending_levels:
+            parts.append(f" *[Also: {', '.join(pending_levels)}]*")
+        
+        parts.append(f"\n*{asset_name}* touched {', '.join(level_names)} levels!\n\n")
+        for level_type, level_value in levels_touched:
+            parts.append(f"{LEVEL_EMOJI.get(level_type, '📊')} *{level_type.value}:* `{level_value:.2f}`\n")
+        parts.append(
+            f"🚨 *Alert Time:* `{detection_time.strftime('%H:%M:%S')}` *(REAL-TIME)*\n"
+            f"📅 *Data Time:* `{candle.time_str}`\n"
+        )
         
+        if any(level_type in KEY_ALERT_LEVELS for level_type, _ in levels_touched):
+            parts.append(KEY_LEVEL_NOTE)
         
-        # Add significance indicators
-        if level_type in [LevelType.S1, LevelType.R1]:
-            message += f"\n\n🎯 *Key Level Alert* - Major support/resistance"
+        parts.append(f"\n⏰ *Next alert for {asset_name}:* 30 minutes")
         
-        # Add cooldown info
-        message += f"\n⏰ *Next alert for {asset_name}:* 30 minutes"
+        return self.send_alert("".join(parts))
+
+class PooledFyersTransport:
+    """Stand-in for the `requests` module inside the Fyers SDK that routes calls through one pooled Session."""
+    
+    def __init__(self, pool_maxsize: int = 40):
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0))
+    
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        return self.session.post(url, **kwargs)
+    
+    def patch(self, url, **kwargs):
+        return self.session.patch(url, **kwargs)
+    
+    def delete(self, url, **kwargs):
+        return self.session.delete(url, **kwargs)
+    
+    def close(self):
+        self.session.close()
+    
+    def __getattr__(self, name):
+        # Exceptions and anything else the SDK looks up still come from requests
+        return getattr(requests, name)
+
+def resolution_seconds(resolution: str) -> int:
+    """Bar length in seconds for a Fyers resolution string ("15s", "1", "5", "D")."""
+    if resolution.endswith('s'):
+        return int(resolution[:-1])
+    if resolution in ('D', '1D'):
+        return 86400
+    return int(resolution) * 60
+
+@lru_cache(maxsize=256)
+def candle_clock(timestamp: int, time_format: str = '%H:%M:%S') -> Tuple[datetime, str]:
+    """Shared (datetime, time string) for a bar start.
+    
+    Bars of every asset in a tick start at the same second, so one conversion serves them all.
+    """
+    candle_datetime = datetime.fromtimestamp(timestamp)
+    return candle_datetime, candle_datetime.strftime(time_format)
+
+class LiveCandleFeed:
+    """Builds fixed-length candles per symbol from websocket LTP ticks."""
+    
+    def __init__(self, bar_seconds: int):
+        self.bar_seconds = bar_seconds
+        self.connected = False
+        self._lock = Lock()
+        # symbol -> [bar start, open, high, low, close, cumulative volume at start, latest cumulative volume]
+        self._forming: Dict[str, List[float]] = {}
+        self._closed: Dict[str, CandleData] = {}
+    
+    def on_tick(self, symbol: str, price: float, timestamp: int, cumulative_volume: int = 0):
+        """Fold one trade tick into the symbol's forming bar, closing the previous bar on rollover."""
+        bar_start = timestamp - timestamp % self.bar_seconds
+        with self._lock:
+            bar = self._forming.get(symbol)
+            if bar is None or bar_start > bar[0]:
+                if bar is not None:
+                    self._closed[symbol] = self._to_candle(bar)
+                self._forming[symbol] = [bar_start, price, price, price, price, cumulative_volume, cumulative_volume]
+            elif bar_start == bar[0]:
+                if price > bar[2]:
+                    bar[2] = price
+                if price < bar[3]:
+                    bar[3] = price
+                bar[4] = price
+                bar[6] = cumulative_volume
+    
+    def latest_candle(self, symbol: str, now: Optional[float] = None) -> Optional[CandleData]:
+        """Most recent completed candle, or None if the feed has nothing recent for the symbol."""
+        if not self.connected:
+            return None
+        if now is None:
+            now = time.time()
         
-        return self.send_alert(message)
+        with self._lock:
+            # A quiet symbol's bar closes when its time window ends, not on the next tick
+            bar = self._forming.get(symbol)
+            if bar is not None and bar[0] + self.bar_seconds <= now:
+                self._closed[symbol] = self._to_candle(bar)
+                del self._forming[symbol]
+            candle = self._closed.get(symbol)
+        
+        if candle is None or now - candle.timestamp > 2 * self.bar_seconds + 5:
+            return None
+        return candle
+    
+    @staticmethod
+    def _to_candle(bar: List[float]) -> CandleData:
+        bar_start, o, h, l, c, start_volume, last_volume = bar
+        candle_datetime, time_str = candle_clock(int(bar_start))
+        return CandleData(
+            timestamp=int(bar_start),
+            open=o,
+            high=h,
+            low=l,
+            close=c,
+            volume=int(last_volume - start_volume),
+            datetime=candle_datetime,
+            time_str=time_str
+        )
 
 class FyersService:
     """Enhanced Fyers service with better error handling and data validation."""
@@ -738,14 +1374,26 @@ class FyersService:
     def __init__(self, config: Dict[str, Any]):
         self.app_id = config.get('app_id')
         self.access_token = config.get('access_token')
-        self._lock = Lock()
-        self.last_api_call = 0
-        self.api_call_interval = 0.1  # 100ms between API calls (10 calls per second max)
-        self.api_call_count = 0
-        self.api_window_start = 0
         self.max_api_calls_per_minute = 180  # Use 180 out of 200 to leave buffer
         self.initialization_mode = True  # Flag to distinguish initialization from monitoring
         
+        # Token bucket for Fyers' 10 calls/sec limit; the per-minute budget is enforced separately below
+        self._rate_lock = Lock()
+        self._rate_cond = Condition(self._rate_lock)  # Waiters sleep here with the limiter lock released
+        self.bucket_capacity = 10
+        self.refill_rate = 10.0
+        self.max_calls = self.max_api_calls_per_minute
+        self.tokens = float(self.bucket_capacity)
+        self.last_refill = time.monotonic()
+        # Monotonic timestamps of calls in the last 60s, hard cap of max_calls per minute
+        self._recent_calls = deque()
+        # symbol -> (monotonic retry-after time, consecutive failures), kept separately for
+        # intraday candles and daily history so a flaky live fetch never blocks the daily recalc
+        self._candle_backoff: Dict[str, Tuple[float, int]] = {}
+        self._history_backoff: Dict[str, Tuple[float, int]] = {}
+        self.live_feed: Optional[LiveCandleFeed] = None
+        self._data_socket = None
+        
         if not self.app_id or not self.access_token:
             raise ValueError("Fyers app_id or access_token is missing in config.")
         
@@ -754,6 +1402,14 @@ class FyersService:
     def _initialize_client(self):
         """Initialize Fyers client with error handling."""
         try:
+            # The SDK calls module-level requests.get/post, so every call would open a fresh TLS connection.
+            # Swapping that module global depends on fyers-apiv3 internals (version pinned in
+            # requirements.txt) and applies to every FyersModel in this process.
+            if not isinstance(fyersModel.requests, PooledFyersTransport):
+                transport = PooledFyersTransport()
+                fyersModel.requests = transport
+                atexit.register(transport.close)
+            
             self.client = fyersModel.FyersModel(
                 client_id=self.app_id,
                 token=self.access_token,
@@ -762,116 +1418,167 @@ class FyersService:
             )
             logger.info("Successfully initialized Fyers client")
         except Exception as e:
-            logger.error(f"Failed to initialize Fyers client: {e}")
+            logger.error("Failed to initialize Fyers client: %s", e)
             raise ValueError(f"Could not initialize Fyers client. Error: {e}")
     
-    def _check_api_rate_limit(self) -> bool:
-        """Check if API rate limit allows another call with different limits for init vs monitoring."""
-        current_time = time.time()
+    def _check_api_rate_limit(self, wait: bool = False, timeout: Optional[float] = None) -> bool:
+        """Take a token for one API call; returns False when none is available.
+        
+        Never sleeps by default; with wait=True it blocks in acquire() for up to ``timeout`` seconds.
+        """
+        if wait:
+            return self.acquire(timeout)
+        with self._rate_lock:
+            return self._take_api_token() == 0
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until an API token is available or ``timeout`` expires."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._rate_cond:
+            while True:
+                wait_time = self._take_api_token()
+                if wait_time == 0:
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait_time = min(wait_time, remaining)
+                # Condition.wait releases the limiter lock, so other threads can still take tokens
+                self._rate_cond.wait(wait_time)
+    
+    def _take_api_token(self) -> float:
+        """Consume a token (caller holds _rate_lock); returns 0 on success, else seconds until one is free."""
+        now = time.monotonic()
         
-        # Reset API call counter every minute
-        if current_time - self.api_window_start > 60:
-            self.api_window_start = current_time
-            self.api_call_count = 0
+        # Refill the bucket for the time elapsed since the last check
+        self.tokens = min(self.bucket_capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
         
-        # Use different limits for initialization vs monitoring
-        if self.initialization_mode:
-            # Aggressive during initialization to get all data quickly
-            max_calls = self.max_api_calls_per_minute  # Use full 180 calls/min
-            min_interval = 0.1  # 100ms during init (10 calls/sec)
-        else:
-            # Still generous during monitoring but with some buffer
-            max_calls = 150  # 150 calls per minute during monitoring (75% of limit)
-            min_interval = self.api_call_interval  # 100ms during monitoring
+        # Sliding one-minute window for the hard per-minute cap
+        recent_calls = self._recent_calls
+        while recent_calls and now - recent_calls[0] >= 60:
+            recent_calls.popleft()
         
-        # Check if we've exceeded the rate limit
-        if self.api_call_count >= max_calls:
-            logger.debug(f"API rate limit reached: {self.api_call_count}/{max_calls} calls in current minute")
-            return False
+        if len(recent_calls) >= self.max_calls:
+            logger.debug("API rate limit reached: %d/%d calls in last minute", len(recent_calls), self.max_calls)
+            return 60 - (now - recent_calls[0])
         
-        # Check minimum interval between calls
-        time_since_last = current_time - self.last_api_call
-        if time_since_last < min_interval:
-            sleep_time = min_interval - time_since_last
-            time.sleep(sleep_time)
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.refill_rate
         
-        self.last_api_call = time.time()
-        self.api_call_count += 1
-        return True
+        self.tokens -= 1
+        recent_calls.append(now)
+        return 0
     
     def set_monitoring_mode(self):
         """Switch to monitoring mode with stricter rate limits."""
         self.initialization_mode = False
-        # Reset counters when switching modes
-        self.api_call_count = 0
-        self.api_window_start = time.time()
+        with self._rate_lock:
+            # Still generous during monitoring but with some buffer (75% of limit)
+            self.max_calls = 150
         logger.info("🔄 Switched to monitoring mode with optimized API rate limits (150 calls/min)")
     
-    def get_historical_ohlc(self, symbol: str, target_date: date) -> Optional[OHLCData]:
-        """Enhanced method to get historical OHLC data with multiple fallback strategies."""
-        with self._lock:
-            strategies = [
-                self._try_exact_date,
-                self._try_date_range,
-                self._try_different_resolution,
-                self._try_quotes_fallback
-            ]
-            
-            for i, strategy in enumerate(strategies, 1):
-                if not self._check_api_rate_limit():
-                    logger.warning(f"API rate limit reached, skipping strategy {i} for {symbol}")
-                    continue
-                    
-                logger.info(f"Strategy {i} for {symbol}")
-                result = strategy(symbol, target_date)
-                if result:
-                    logger.info(f"Strategy {i} successful for {symbol}")
-                    return result
-                time.sleep(0.5)
-            
-            logger.error(f"All strategies failed for {symbol}")
+    def get_historical_ohlc(self, symbol: str, target_date: date,
+                            use_quotes_fallback: bool = True) -> Optional[OHLCData]:
+        """Get the daily bar for target_date (or the closest earlier session) with one range request.
+        
+        The 5-day range response is a superset of the exact-date one, so a single call
+        replaces the old strategy chain; quotes are only used when it comes back empty.
+        Callers that batch quotes themselves pass use_quotes_fallback=False. Safe to call
+        from several threads at once; the token bucket paces the requests.
+        """
+        wait = self.initialization_mode
+        if self._in_backoff(self._history_backoff, symbol):
+            logger.info("Skipping historical fetch for %s (backing off after failures)", symbol)
             return None
+        
+        if not self._check_api_rate_limit(wait=wait):
+            logger.warning("API rate limit reached, skipping historical fetch for %s", symbol)
+            return None
+        
+        response = self._request_daily_range(symbol, target_date, "D")
+        if self._is_resolution_error(response) and self._check_api_rate_limit(wait=wait):
+            logger.info("Resolution 'D' rejected for %s, retrying with '1D'", symbol)
+            response = self._request_daily_range(symbol, target_date, "1D")
+        
+        result = self._parse_historical_response(response, target_date, allow_closest=True)
+        if not result and use_quotes_fallback and self._check_api_rate_limit(wait=wait):
+            result = self._try_quotes_fallback(symbol, target_date)
+        
+        self._record_fetch_result(self._history_backoff, symbol, result is not None)
+        if not result and use_quotes_fallback:
+            logger.error("All strategies failed for %s", symbol)
+        return result
     
-    def _try_exact_date(self, symbol: str, target_date: date) -> Optional[OHLCData]:
-        """Try to get data for exact date."""
+    @staticmethod
+    def _in_backoff(backoffs: Dict[str, Tuple[float, int]], symbol: str) -> bool:
+        """True while a symbol is backing off in ``backoffs`` after consecutive failed fetches."""
+        backoff = backoffs.get(symbol)
+        return backoff is not None and time.monotonic() < backoff[0]
+    
+    @staticmethod
+    def _record_fetch_result(backoffs: Dict[str, Tuple[float, int]], symbol: str, success: bool):
+        """Clear a symbol's backoff on success, otherwise double its delay (with jitter, capped)."""
+        if success:
+            backoffs.pop(symbol, None)
+            return
+        
+        failures = backoffs.get(symbol, (0.0, 0))[1]
+        delay = min(FAILURE_BACKOFF_BASE * 2 ** failures, FAILURE_BACKOFF_MAX)
+        retry_at = time.monotonic() + delay + random.uniform(0, FAILURE_BACKOFF_BASE)
+        backoffs[symbol] = (retry_at, failures + 1)
+        logger.debug("Backing off %s for %.0fs after %d failed fetches", symbol, delay, failures + 1)
+    
+    def _request_daily_range(self, symbol: str, target_date: date, resolution: str) -> Dict[str, Any]:
+        """Fetch daily candles for the five days up to target_date; returns {} on transport errors."""
         try:
+            start_date = target_date - timedelta(days=5)
+            
             data = {
                 "symbol": symbol,
-                "resolution": "D",
+                "resolution": resolution,
                 "date_format": "1",
-                "range_from": target_date.strftime('%Y-%m-%d'),
-                "range_to": target_date.strftime('%Y-%m-%d'),
+                "range_from": start_date.isoformat(),
+                "range_to": target_date.isoformat(),
                 "cont_flag": "1"
             }
             
-            response = self.client.history(data=data)
-            return self._parse_historical_response(response, target_date)
+            return self.client.history(data=data)
             
         except Exception as e:
-            logger.debug(f"Exact date strategy failed: {e}")
-            return None
+            logger.debug("Daily range request failed for %s: %s", symbol, e)
+            return {}
     
-    def _try_date_range(self, symbol: str, target_date: date) -> Optional[OHLCData]:
-        """Try to get data from a date range."""
+    @staticmethod
+    def _is_resolution_error(response: Dict[str, Any]) -> bool:
+        """True if the API rejected the request because of its resolution value."""
+        return response.get('s') == 'error' and 'resolution' in str(response.get('message', '')).lower()
+    
+    def _try_exact_date(self, symbol: str, target_date: date) -> Optional[OHLCData]:
+        """Try to get data for exact date."""
         try:
-            start_date = target_date - timedelta(days=5)
-            
             data = {
                 "symbol": symbol,
                 "resolution": "D",
                 "date_format": "1",
-                "range_from": start_date.strftime('%Y-%m-%d'),
-                "range_to": target_date.strftime('%Y-%m-%d'),
+                "range_from": target_date.isoformat(),
+                "range_to": target_date.isoformat(),
                 "cont_flag": "1"
             }
             
             response = self.client.history(data=data)
-            return self._parse_historical_response(response, target_date, allow_closest=True)
+            return self._parse_historical_response(response, target_date)
             
         except Exception as e:
-            logger.debug(f"Date range strategy failed: {e}")
+            logger.debug("Exact date strategy failed: %s", e)
             return None
     
+    def _try_date_range(self, symbol: str, target_date: date) -> Optional[OHLCData]:
+        """Try to get data from a date range."""
+        response = self._request_daily_range(symbol, target_date, "D")
+        return self._parse_historical_response(response, target_date, allow_closest=True)
+    
     def _try_different_resolution(self, symbol: str, target_date: date) -> Optional[OHLCData]:
         """Try different resolution formats."""
         try:
@@ -879,8 +1586,8 @@ class FyersService:
                 "symbol": symbol,
                 "resolution": "1D",
                 "date_format": "1",
-                "range_from": target_date.strftime('%Y-%m-%d'),
-                "range_to": target_date.strftime('%Y-%m-%d'),
+                "range_from": target_date.isoformat(),
+                "range_to": target_date.isoformat(),
                 "cont_flag": "1"
             }
             
@@ -888,7 +1595,7 @@ class FyersService:
             return self._parse_historical_response(response, target_date)
             
         except Exception as e:
-            logger.debug(f"Different resolution strategy failed: {e}")
+            logger.debug("Different resolution strategy failed: %s", e)
             return None
     
     def _try_quotes_fallback(self, symbol: str, target_date: date) -> Optional[OHLCData]:
@@ -897,25 +1604,56 @@ class FyersService:
             response = self.client.quotes({"symbols": symbol})
             
             if response.get('s') == 'ok' and response.get('d'):
-                quote_data = response['d'][0]['v']
-                prev_close = quote_data.get('prev_close_price')
-                
-                if prev_close:
-                    estimated_ohlc = OHLCData(
-                        open=prev_close,
-                        high=prev_close * 1.01,
-                        low=prev_close * 0.99,
-                        close=prev_close,
-                        date=target_date,
-                        source="quotes_estimate"
-                    )
-                    logger.warning(f"Using estimated OHLC from quotes for {symbol}")
+                estimated_ohlc = self._estimate_from_quote(response['d'][0]['v'], target_date)
+                if estimated_ohlc:
+                    logger.warning("Using estimated OHLC from quotes for %s", symbol)
                     return estimated_ohlc
                     
         except Exception as e:
-            logger.debug(f"Quotes fallback strategy failed: {e}")
+            logger.debug("Quotes fallback strategy failed: %s", e)
             return None
     
+    def get_quote_estimates(self, symbols: List[str], target_date: date) -> Dict[str, OHLCData]:
+        """Estimate OHLC from quotes for many symbols, one request per QUOTES_BATCH_SIZE symbols."""
+        estimates = {}
+        
+        for i in range(0, len(symbols), QUOTES_BATCH_SIZE):
+            chunk = symbols[i:i + QUOTES_BATCH_SIZE]
+            if not self._check_api_rate_limit(wait=self.initialization_mode):
+                logger.warning("API rate limit reached, skipping quotes for %d symbols", len(chunk))
+                continue
+            
+            try:
+                response = self.client.quotes({"symbols": ",".join(chunk)})
+            except Exception as e:
+                logger.debug("Batch quotes request failed: %s", e)
+                continue
+            
+            if response.get('s') != 'ok':
+                continue
+            for entry in response.get('d') or ():
+                estimated_ohlc = self._estimate_from_quote(entry.get('v') or {}, target_date)
+                if estimated_ohlc:
+                    estimates[entry.get('n')] = estimated_ohlc
+        
+        return estimates
+    
+    @staticmethod
+    def _estimate_from_quote(quote_data: Dict[str, Any], target_date: date) -> Optional[OHLCData]:
+        """Quotes only carry the previous close, so high/low are estimated at +/-1%."""
+        prev_close = quote_data.get('prev_close_price')
+        if not prev_close:
+            return None
+        
+        return OHLCData(
+            open=prev_close,
+            high=prev_close * 1.01,
+            low=prev_close * 0.99,
+            close=prev_close,
+            date=target_date,
+            source="quotes_estimate"
+        )
+    
     def _parse_historical_response(self, response: Dict[str, Any], target_date: date, 
                                  allow_closest: bool = False) -> Optional[OHLCData]:
         """Parse historical API response."""
@@ -926,12 +1664,36 @@ class FyersService:
         if not candles:
             return None
         
+        # Ranges end at target_date and candles come oldest first, so the last one is
+        # almost always the exact match; only scan the rest when it is not
+        best_candle = candles[-1]
+        best_date = date.fromtimestamp(best_candle[0])
+        if best_date != target_date:
+            best_candle, best_date = self._closest_candle(candles, target_date, allow_closest)
+        
+        if best_candle:
+            timestamp, o, h, l, c, volume = best_candle
+            return OHLCData(
+                open=o,
+                high=h,
+                low=l,
+                close=c,
+                date=best_date,
+                volume=volume,
+                source="historical"
+            )
+        
+        return None
+    
+    @staticmethod
+    def _closest_candle(candles: List[List[float]], target_date: date, 
+                        allow_closest: bool) -> Tuple[Optional[List[float]], Optional[date]]:
+        """Candle dated target_date, else (with allow_closest) the nearest one by date."""
         best_candle = None
         best_date = None
         
         for candle in candles:
-            timestamp, o, h, l, c, volume = candle
-            candle_date = datetime.fromtimestamp(timestamp).date()
+            candle_date = date.fromtimestamp(candle[0])
             
             if candle_date == target_date:
                 best_candle = candle
@@ -941,27 +1703,89 @@ class FyersService:
                 best_candle = candle
                 best_date = candle_date
         
-        if best_candle:
-            timestamp, o, h, l, c, volume = best_candle
-            return OHLCData(
-                open=o,
-                high=h,
-                low=l,
-                close=c,
-                date=best_date,
-                volume=volume,
-                source="historical"
+        return best_candle, best_date
+    
+    def start_live_feed(self, symbols: List[str], resolution: str) -> bool:
+        """Subscribe to the websocket tick feed; get_latest_candle() serves candles from it while connected."""
+        feed = LiveCandleFeed(resolution_seconds(resolution))
+        
+        def on_connect():
+            feed.connected = True
+            self._data_socket.subscribe(symbols=symbols, data_type="SymbolUpdate")
+            logger.info("📡 Live feed connected, subscribed to %d symbols", len(symbols))
+        
+        def on_close(message):
+            feed.connected = False
+            logger.warning("📡 Live feed closed: %s", message)
+        
+        def on_error(message):
+            logger.warning("📡 Live feed error: %s", message)
+        
+        def on_message(message):
+            price = message.get('ltp')
+            symbol = message.get('symbol')
+            if price is None or symbol is None:
+                return
+            timestamp = int(message.get('exch_feed_time') or time.time())
+            feed.on_tick(symbol, price, timestamp, message.get('vol_traded_today') or 0)
+        
+        try:
+            self._data_socket = data_ws.FyersDataSocket(
+                access_token=f"{self.app_id}:{self.access_token}",
+                log_path=".",
+                litemode=False,
+                write_to_file=False,
+                reconnect=True,
+                on_connect=on_connect,
+                on_close=on_close,
+                on_error=on_error,
+                on_message=on_message
             )
+            self.live_feed = feed
+            self._data_socket.connect()
+            return True
+        except Exception as e:
+            logger.error("Could not start live feed, polling REST instead: %s", e)
+            self.live_feed = None
+            return False
+    
+    def stop_live_feed(self):
+        """Close the websocket feed; candles come from REST polling again afterwards."""
+        feed, socket = self.live_feed, self._data_socket
+        self.live_feed = None
+        self._data_socket = None
+        if feed is not None:
+            feed.connected = False
+        if socket is not None:
+            try:
+                socket.close_connection()
+            except Exception as e:
+                logger.debug("Error closing live feed: %s", e)
+    
+    def get_latest_candle(self, symbol: str, resolution: str = "30s", wait: bool = False) -> Optional[CandleData]:
+        """Get the latest candle with seconds resolution for real-time detection.
+        
+        Served from the live feed when it has a recent bar; REST history is the fallback.
+        """
+        feed = self.live_feed
+        if feed is not None:
+            candle = feed.latest_candle(symbol)
+            if candle is not None:
+                return candle
+        
+        if self._in_backoff(self._candle_backoff, symbol):
+            return None
+        if not self._check_api_rate_limit(wait=wait, timeout=CANDLE_TOKEN_TIMEOUT):
+            logger.warning("API rate limit reached for %s, skipping candle fetch", symbol)
+            return None
         
-        return None
+        candle = self._fetch_latest_candle(symbol, resolution)
+        self._record_fetch_result(self._candle_backoff, symbol, candle is not None)
+        return candle
     
-    def get_latest_candle(self, symbol: str, resolution: str = "30s") -> Optional[CandleData]:
-        """Get the latest candle with seconds resolution for real-time detection."""
+    def _fetch_latest_candle(self, symbol: str, resolution: str) -> Optional[CandleData]:
+        """Request the latest candle, falling back to coarser resolutions on failure."""
         try:
-            if not self._check_api_rate_limit():
-                logger.warning(f"API rate limit reached for {symbol}, skipping candle fetch")
-                return None
-                
             end_time = datetime.now()
             start_time = end_time - timedelta(minutes=30)  # Shorter window for seconds data
             
@@ -969,8 +1793,8 @@ class FyersService:
                 "symbol": symbol,
                 "resolution": resolution,
                 "date_format": "1",
-                "range_from": start_time.strftime('%Y-%m-%d'),
-                "range_to": end_time.strftime('%Y-%m-%d'),
+                "range_from": start_time.date().isoformat(),
+                "range_to": end_time.date().isoformat(),
                 "cont_flag": "1"
             }
             
@@ -981,7 +1805,7 @@ class FyersService:
                 if candles:
                     latest_candle = candles[-1]
                     timestamp, o, h, l, c, volume = latest_candle
-                    candle_datetime = datetime.fromtimestamp(timestamp)
+                    candle_datetime, time_str = candle_clock(timestamp)  # Include seconds
                     
                     return CandleData(
                         timestamp=timestamp,
@@ -991,23 +1815,24 @@ class FyersService:
                         close=c,
                         volume=volume,
                         datetime=candle_datetime,
-                        time_str=candle_datetime.strftime('%H:%M:%S')  # Include seconds
+                        time_str=time_str
                     )
             else:
                 # Fallback hierarchy: 30s -> 1m -> 5m
                 return self._try_fallback_resolutions(symbol, start_time, end_time)
                     
         except Exception as e:
-            logger.debug(f"Error fetching {resolution} candle for {symbol}: {e}")
+            logger.debug("Error fetching %s candle for %s: %s", resolution, symbol, e)
             return self._try_fallback_resolutions(symbol, start_time, end_time)
     
     def _try_fallback_resolutions(self, symbol: str, start_time: datetime, end_time: datetime) -> Optional[CandleData]:
         """Try different resolutions in order of preference for real-time data."""
         fallback_resolutions = ["15s", "1", "3", "5"]  # 15s, 1m, 3m, 5m
+        range_to = end_time.date().isoformat()
         
         for resolution in fallback_resolutions:
             try:
-                logger.debug(f"Trying fallback resolution {resolution} for {symbol}")
+                logger.debug("Trying fallback resolution %s for %s", resolution, symbol)
                 
                 # Adjust time window based on resolution
                 if 's' in resolution:  # Seconds
@@ -1021,8 +1846,8 @@ class FyersService:
                     "symbol": symbol,
                     "resolution": resolution,
                     "date_format": "1",
-                    "range_from": start.strftime('%Y-%m-%d'),
-                    "range_to": end_time.strftime('%Y-%m-%d'),
+                    "range_from": start.date().isoformat(),
+                    "range_to": range_to,
                     "cont_flag": "1"
                 }
                 
@@ -1033,15 +1858,15 @@ class FyersService:
                     if candles:
                         latest_candle = candles[-1]
                         timestamp, o, h, l, c, volume = latest_candle
-                        candle_datetime = datetime.fromtimestamp(timestamp)
                         
                         # Format time string based on resolution
                         if 's' in resolution:
                             time_format = '%H:%M:%S'
                         else:
                             time_format = '%H:%M'
+                        candle_datetime, time_str = candle_clock(timestamp, time_format)
                         
-                        logger.info(f"✅ Using {resolution} resolution for {symbol}")
+                        logger.info("✅ Using %s resolution for %s", resolution, symbol)
                         
                         return CandleData(
                             timestamp=timestamp,
@@ -1051,41 +1876,35 @@ class FyersService:
                             close=c,
                             volume=volume,
                             datetime=candle_datetime,
-                            time_str=candle_datetime.strftime(time_format)
+                            time_str=time_str
                         )
                         
             except Exception as e:
-                logger.debug(f"Fallback resolution {resolution} failed for {symbol}: {e}")
+                logger.debug("Fallback resolution %s failed for %s: %s", resolution, symbol, e)
                 continue
         
-        logger.warning(f"All fallback resolutions failed for {symbol}")
+        logger.warning("All fallback resolutions failed for %s", symbol)
         return None
 
 class MarketHoursChecker:
     """Checks if market is open based on Indian market hours."""
     
     def __init__(self, market_hours: Dict[str, str]):
-        self.market_start = datetime.strptime(market_hours.get('start', '09:15'), '%H:%M').time()
-        self.market_end = datetime.strptime(market_hours.get('end', '15:30'), '%H:%M').time()
-        self.pre_market_start = datetime.strptime(market_hours.get('pre_market_start', '09:00'), '%H:%M').time()
-        self.post_market_end = datetime.strptime(market_hours.get('post_market_end', '15:45'), '%H:%M').time()
+        self.market_start, self.market_end, self.pre_market_start, self.post_market_end = _parse_market_hours(
+            market_hours.get('start', '09:15'),
+            market_hours.get('end', '15:30'),
+            market_hours.get('pre_market_start', '09:00'),
+            market_hours.get('post_market_end', '15:45')
+        )
     
-    def is_market_open(self) -> bool:
-        """Check if market is currently open."""
-        now = datetime.now()
-        
-        # Check if it's a weekend
-        if now.weekday() >= 5:  # Saturday=5, Sunday=6
-            return False
-        
-        current_time = now.time()
-        
-        # Check if within market hours
-        return self.market_start <= current_time <= self.market_end
+    def is_market_open(self, now: Optional[datetime] = None) -> bool:
+        """Check if market is open at ``now`` (defaults to the current time)."""
+        return self.get_market_status(now) == MarketStatus.OPEN
     
-    def get_market_status(self) -> MarketStatus:
-        """Get current market status."""
-        now = datetime.now()
+    def get_market_status(self, now: Optional[datetime] = None) -> MarketStatus:
+        """Get market status at ``now`` (defaults to the current time)."""
+        if now is None:
+            now = datetime.now()
         
         if now.weekday() >= 5:
             return MarketStatus.CLOSED
@@ -1109,6 +1928,7 @@ class CPRAlertBot:
         self.db_service = DatabaseService()
         self.fyers_service = FyersService(self.config['fyers'])
         self.telegram_service = TelegramService(self.config['telegram'])
+        self.candle_executor = ThreadPoolExecutor(max_workers=CANDLE_FETCH_WORKERS, thread_name_prefix="candle-fetch")
         # Initialize touch detector with less sensitive tolerance
         default_tolerance = 0.25  # Increased from 0.1% to 0.25% to reduce false positives
         configured_tolerance = self.config.get('alert_settings', {}).get('tolerance_percent', default_tolerance)
@@ -1119,9 +1939,9 @@ class CPRAlertBot:
         self.touch_detector = LevelTouchDetector(tolerance_percent=final_tolerance)
         
         if final_tolerance != configured_tolerance:
-            logger.info(f"📊 Touch tolerance adjusted from {configured_tolerance}% to {final_tolerance}% (spam prevention)")
+            logger.info("📊 Touch tolerance adjusted from %s%% to %s%% (spam prevention)", configured_tolerance, final_tolerance)
         else:
-            logger.info(f"📊 Touch tolerance set to {final_tolerance}%")
+            logger.info("📊 Touch tolerance set to %s%%", final_tolerance)
         
         # Initialize cooldown manager with configurable cooldown period
         default_cooldown = 30  # Increased default from 15 to 30 minutes
@@ -1141,21 +1961,28 @@ class CPRAlertBot:
             self.check_interval = max(self.check_interval, 60)
         
         self.asset_data: Dict[str, AssetData] = {}
+        self._asset_items: Tuple[Tuple[str, AssetData], ...] = ()  # Snapshot of asset_data, rebuilt when assets change
         self.is_running = False
-        self._lock = Lock()
+        # Set by stop_monitoring() so the loop's waits end immediately instead of sleeping out the interval
+        self._stop_event = Event()
+        # Bumped by _reset_daily_data(); assets clear their own tracking data when they lag behind
+        self._generation = 0
+        # Telegram delivery runs on its own thread so slow sends never hold up detection
+        self.alert_queue: "queue.Queue[Optional[AlertJob]]" = queue.Queue(maxsize=ALERT_QUEUE_SIZE)
+        self._alert_thread: Optional[Thread] = None
         
-        # Schedule daily level calculation
-        schedule.every().day.at("08:00").do(self._calculate_daily_levels)
+        # Daily level calculation deadline, checked from the monitoring loop
+        self._next_daily_run = DateHelper.next_daily_run(DAILY_RECALC_TIME)
         
-        logger.info(f"🕕 Alert cooldown period set to {self.cooldown_manager.cooldown_minutes} minutes PER STOCK")
-        logger.info(f"⚡ Using {self.preferred_resolution} resolution for detection (spam-optimized)")
-        logger.info(f"🔄 Check interval: {self.check_interval} seconds (spam-prevention)")
+        logger.info("🕕 Alert cooldown period set to %s minutes PER STOCK", self.cooldown_manager.cooldown_minutes)
+        logger.info("⚡ Using %s resolution for detection (spam-optimized)", self.preferred_resolution)
+        logger.info("🔄 Check interval: %s seconds (spam-prevention)", self.check_interval)
         
         # Log spam prevention settings
         if self.check_interval < 30:
-            logger.warning(f"⚠️ Check interval {self.check_interval}s may cause spam alerts. Recommended: 30s+")
+            logger.warning("⚠️ Check interval %ss may cause spam alerts. Recommended: 30s+", self.check_interval)
         if 's' in self.preferred_resolution and int(self.preferred_resolution.replace('s', '')) < 60:
-            logger.warning(f"⚠️ Resolution {self.preferred_resolution} may cause spam alerts. Recommended: 1m+")
+            logger.warning("⚠️ Resolution %s may cause spam alerts. Recommended: 1m+", self.preferred_resolution)
         
         # Send startup notification
         self._send_startup_alert()
@@ -1170,25 +1997,27 @@ class CPRAlertBot:
             stocks_config = os.getenv("STOCKS_CONFIG", "")
             stock_source = "custom configuration" if stocks_config else "default list"
             
-            message = f"🚀 **CPR Alert Bot Started**\n\n"
-            message += f"📅 **Startup Time:** `{startup_time}`\n"
-            message += f"📊 **Assets Monitored:** {num_assets} stocks\n"
-            message += f"📋 **Stock Source:** {stock_source}\n"
-            message += f"⚡ **Resolution:** {self.preferred_resolution}\n"
-            message += f"🔄 **Check Interval:** {self.check_interval}s\n"
-            message += f"🕕 **Cooldown Period:** {self.cooldown_manager.cooldown_minutes}min\n"
-            message += f"🎯 **Tolerance:** {self.touch_detector.tolerance_percent}%\n\n"
+            parts = [STARTUP_MESSAGE_TEMPLATE.format(
+                startup_time=startup_time,
+                num_assets=num_assets,
+                stock_source=stock_source,
+                resolution=self.preferred_resolution,
+                check_interval=self.check_interval,
+                cooldown_minutes=self.cooldown_manager.cooldown_minutes,
+                tolerance=self.touch_detector.tolerance_percent
+            )]
             
             # Add first few stocks being monitored
             if num_assets > 0:
-                message += f"**Sample Assets:**\n"
+                parts.append("**Sample Assets:**\n")
                 sample_assets = self.config.get('assets', [])[:5]  # First 5 stocks
                 for asset in sample_assets:
-                    message += f"• {asset['name']} ({asset['symbol']})\n"
+                    parts.append(f"• {asset.name} ({asset.symbol})\n")
                 if num_assets > 5:
-                    message += f"• ... and {num_assets - 5} more\n"
+                    parts.append(f"• ... and {num_assets - 5} more\n")
             
-            message += f"\n✅ **Bot is ready for monitoring!**"
+            parts.append("\n✅ **Bot is ready for monitoring!**")
+            message = "".join(parts)
             
             success = self.telegram_service.send_alert(message)
             if success:
@@ -1197,7 +2026,7 @@ class CPRAlertBot:
                 logger.warning("⚠️ Failed to send startup alert to Telegram")
                 
         except Exception as e:
-            logger.error(f"Error sending startup alert: {e}")
+            logger.error("Error sending startup alert: %s", e)
     
     def initialize_daily_levels(self) -> bool:
         """Initialize CPR levels for all configured assets."""
@@ -1206,39 +2035,87 @@ class CPRAlertBot:
         target_date = DateHelper.get_previous_trading_day()
         assets = self.config.get('assets', [])
         
-        success_count = 0
+        ohlc_by_symbol: Dict[str, OHLCData] = {}
+        to_fetch = []
         
         for asset_config in assets:
-            symbol = asset_config['symbol']
-            name = asset_config['name']
+            symbol = asset_config.symbol
+            name = asset_config.name
             
-            logger.info(f"Processing {name} ({symbol})")
+            logger.info("Processing %s (%s)", name, symbol)
             
-            ohlc = self.fyers_service.get_historical_ohlc(symbol, target_date)
+            # Previous-day bars are immutable, so a restart can reuse what was already fetched
+            ohlc = self.db_service.get_cached_ohlc(symbol, target_date)
             if ohlc:
-                levels = CPRCalculator.calculate_levels(ohlc)
-                
-                asset_data = AssetData(
-                    name=name,
-                    symbol=symbol,
-                    levels=levels,
-                    source_data=ohlc
-                )
-                
-                self.asset_data[symbol] = asset_data
-                
-                # Save to database
-                self.db_service.save_daily_levels(
-                    symbol, target_date.strftime('%Y-%m-%d'), levels, ohlc
-                )
-                
-                success_count += 1
-                logger.info(f"✅ Success: {name} - CPR levels calculated")
-                
+                logger.info("Using cached OHLC for %s (%s)", name, target_date)
+                ohlc_by_symbol[symbol] = ohlc
             else:
-                logger.error(f"❌ Failed: {name} - Could not get historical data")
+                to_fetch.append(symbol)
+        
+        # Uncached bars are fetched concurrently; the API token bucket paces the requests
+        futures = {
+            self.candle_executor.submit(
+                self.fyers_service.get_historical_ohlc, symbol, target_date, use_quotes_fallback=False
+            ): symbol
+            for symbol in to_fetch
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                ohlc = future.result()
+            except Exception as e:
+                logger.error("Error fetching historical data for %s: %s", symbol, e)
+                continue
+            if ohlc:
+                self.db_service.cache_ohlc(symbol, target_date, ohlc)
+                ohlc_by_symbol[symbol] = ohlc
+        
+        # Keep the configured asset order
+        fetched = []
+        missing = []
+        for asset_config in assets:
+            symbol = asset_config.symbol
+            ohlc = ohlc_by_symbol.get(symbol)
+            if ohlc:
+                fetched.append((symbol, asset_config.name, ohlc))
+            else:
+                missing.append((symbol, asset_config.name))
+        
+        # Symbols without history share batched quotes requests instead of one call each
+        if missing:
+            estimates = self.fyers_service.get_quote_estimates([symbol for symbol, _ in missing], target_date)
+            for symbol, name in missing:
+                ohlc = estimates.get(symbol)
+                if ohlc:
+                    logger.warning("Using estimated OHLC from quotes for %s", symbol)
+                    fetched.append((symbol, name, ohlc))
+                else:
+                    logger.error("❌ Failed: %s - Could not get historical data", name)
+        
+        level_rows = []
+        for symbol, name, ohlc in fetched:
+            levels = CPRCalculator.calculate_levels(ohlc)
+            level_rows.append((symbol, levels, ohlc))
+            tolerances = self.touch_detector.level_tolerances(levels)
+            asset_data = AssetData(
+                name=name,
+                symbol=symbol,
+                levels=levels,
+                source_data=ohlc,
+                level_tolerances=tolerances,
+                key_level_rows=self.touch_detector.level_rows(levels, KEY_LEVELS, tolerances),
+                generation=self._generation
+            )
+            
+            self.asset_data[symbol] = asset_data
+            logger.info("✅ Success: %s - CPR levels calculated", name)
+        
+        # Save every asset's levels in one transaction
+        self.db_service.save_daily_levels_bulk(target_date.isoformat(), level_rows)
+        
+        self._rebuild_asset_items()
         
-        if success_count > 0:
+        if fetched:
             self._send_daily_summary(target_date)
             return True
         else:
@@ -1271,222 +2148,262 @@ class CPRAlertBot:
             return
         
         self.is_running = True
+        self._stop_event.clear()
         # Switch Fyers service to monitoring mode
         self.fyers_service.set_monitoring_mode()
+        self._start_alert_sender()
         
-        logger.info(f"🔍 Starting monitoring for {len(self.asset_data)} assets")
-        logger.info(f"⚡ Real-time mode: {self.preferred_resolution} candles every {self.check_interval}s")
+        # Push-based candles from the websocket; REST polling covers gaps and disconnects.
+        # Opt-in: the feed serves the last completed bar while REST serves the forming one
+        if self.config.get('alert_settings', {}).get('use_live_feed', False):
+            self.fyers_service.start_live_feed(list(self.asset_data), self.preferred_resolution)
         
-        market_hours = self.config['alert_settings']['market_hours']
+        logger.info("🔍 Starting monitoring for %s assets", len(self.asset_data))
+        logger.info("⚡ Real-time mode: %s candles every %ss", self.preferred_resolution, self.check_interval)
         
-        # Start schedule checker in a separate thread
-        schedule_thread = Thread(target=self._run_schedule, daemon=True)
-        schedule_thread.start()
+        # Market hours are parsed once; each tick only compares against the parsed times
+        market_hours_checker = MarketHoursChecker(self.config['alert_settings']['market_hours'])
+        market_end = market_hours_checker.market_end
         
         while self.is_running:
+            cycle_start = time.monotonic()
             try:
-                current_time = datetime.now().time()
-                market_status = DateHelper.is_market_time(current_time, market_hours)
+                if time.time() >= self._next_daily_run:
+                    self._next_daily_run = DateHelper.next_daily_run(DAILY_RECALC_TIME)
+                    self._calculate_daily_levels()
+                
+                # Market status is computed once per tick and shared by every asset in the scan
+                now = datetime.now()
+                current_time = now.time()
+                market_status = market_hours_checker.get_market_status(now)
                 
                 if market_status == MarketStatus.OPEN:
-                    self._check_level_touches()
+                    self._check_level_touches(now)
                 elif market_status == MarketStatus.CLOSED:
-                    if datetime.now().time() > datetime.strptime(market_hours['end'], '%H:%M').time():
+                    if current_time > market_end:
                         self._reset_daily_data()
-                    time.sleep(300)  # Sleep longer when market is closed
+                    self._stop_event.wait(300)  # Sleep longer when market is closed
                     continue
                 
-                time.sleep(self.check_interval)
+                # Ticks start every check_interval seconds regardless of how long the scan took
+                self._stop_event.wait(max(0.0, self.check_interval - (time.monotonic() - cycle_start)))
                 
             except KeyboardInterrupt:
                 logger.info("Received interrupt signal, stopping...")
                 break
             except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
-                time.sleep(30)  # Wait before retrying
+                logger.error("Error in monitoring loop: %s", e)
+                self._stop_event.wait(30)  # Wait before retrying
         
         self.is_running = False
+        self.fyers_service.stop_live_feed()
+        self._stop_alert_sender()
+        self.db_service.flush_alerts()
         logger.info("Monitoring stopped")
     
-    def _run_schedule(self):
-        """Run scheduled tasks in a separate thread."""
-        while self.is_running:
-            schedule.run_pending()
-            time.sleep(60)
+    def _rebuild_asset_items(self):
+        """Snapshot asset_data for the fetch loop; call whenever assets are (re)loaded."""
+        self._asset_items = tuple(self.asset_data.items())
     
-    def _check_level_touches(self):
-        """Check all assets for level touches with stock-wide cooldown logic."""
-        current_time = datetime.now()
+    def _check_level_touches(self, now: Optional[datetime] = None):
+        """Check all assets for level touches with stock-wide cooldown logic.
+        
+        ``now`` is the monitoring loop's reading for this tick, taken here if omitted.
+        """
+        # Submit every asset at once: the pool caps in-flight requests at CANDLE_FETCH_WORKERS
+        # and the Fyers token bucket throttles them, so there is no per-batch barrier
+        futures = {
+            self.candle_executor.submit(
+                self.fyers_service.get_latest_candle, symbol, self.preferred_resolution, True
+            ): (symbol, asset_data)
+            for symbol, asset_data in self._asset_items
+        }
         
-        # Process assets in larger batches since we have generous API limits
-        asset_items = list(self.asset_data.items())
-        batch_size = 25  # Process 25 assets at a time (increased from 10)
+        # One clock reading per tick; cooldowns are minutes long, so tick-level freshness is ample
+        now = now or datetime.now()
+        now_monotonic = time.monotonic()
         
-        for i in range(0, len(asset_items), batch_size):
-            batch = asset_items[i:i + batch_size]
+        for future in as_completed(futures):
+            symbol, asset_data = futures[future]
+            try:
+                candle = future.result()
+                if candle:
+                    self._process_candle(symbol, asset_data, candle, now, now_monotonic)
+            except Exception as e:
+                logger.error("Error checking levels for %s: %s", symbol, e)
+    
+    def _process_candle(self, symbol: str, asset_data: AssetData, candle: CandleData,
+                        now: Optional[datetime] = None, now_monotonic: Optional[float] = None):
+        """Run touch detection and alerting for one freshly fetched candle.
+        
+        ``now``/``now_monotonic`` are the tick's clock readings, taken here if omitted.
+        
+        Only the monitoring thread mutates per-asset state (fetch workers just return
+        candles), so no lock is needed here.
+        """
+        if asset_data.generation != self._generation:
+            self._reset_asset(asset_data)
+        # Each candle is processed once, which also keeps one alert per candle
+        if candle.timestamp <= asset_data.last_candle_timestamp:
+            return
+        asset_data.last_candle_timestamp = candle.timestamp
+        
+        # Update recent candles for better level touch validation (ring buffer keeps the latest and previous candle)
+        asset_data.recent_candles.append(candle)
+        
+        # Check only S1, R1, and PIVOT levels (key levels); rows are built once per day
+        rows = asset_data.key_level_rows
+        if not rows:
+            rows = asset_data.key_level_rows = self.touch_detector.level_rows(
+                asset_data.levels, KEY_LEVELS, asset_data.level_tolerances)
+        
+        # Check if any level was touched in this candle - single pass with directional validation (volume filter removed)
+        touched_mask = self.touch_detector.scan_level_rows(candle, rows, asset_data.recent_candles)
+        if not touched_mask:
+            return
+        levels_touched_now = [
+            (level_type, level_value)
+            for level_type, level_value, *_ in rows if touched_mask & LEVEL_BITS[level_type]
+        ]
+        
+        # Rows follow KEY_LEVELS priority, so the most significant level is first; it drives the cooldown record
+        first_level_type, first_level_value = levels_touched_now[0]
+        
+        # Use real current time for cooldown logic, not candle timestamp
+        real_current_time = now or datetime.now()
+        if now_monotonic is None:
+            now_monotonic = time.monotonic()
+        
+        # Check if we can send alert (stock-wide cooldown logic)
+        if self.cooldown_manager.can_send_alert(asset_data, first_level_type, now_monotonic):
+            # Get pending touches summary
+            pending_touches, pending_levels = self.cooldown_manager.get_pending_touches_summary(asset_data)
             
-            for symbol, asset_data in batch:
-                try:
-                    candle = self.fyers_service.get_latest_candle(symbol, self.preferred_resolution)
-                    
-                    if not candle:
-                        continue
-                    
-                    # Thread-safe timestamp check and update
-                    with self._lock:
-                        if candle.timestamp <= asset_data.last_candle_timestamp:
-                            continue
-                        asset_data.last_candle_timestamp = candle.timestamp
-                        
-                        # Update recent candles for better level touch validation
-                        asset_data.recent_candles.append(candle)
-                        # Keep only last 5 candles
-                        if len(asset_data.recent_candles) > 5:
-                            asset_data.recent_candles.pop(0)
-                    
-                    # Check only S1, R1, and PIVOT levels (key levels)
-                    key_levels = [LevelType.S1, LevelType.R1, LevelType.PIVOT]
-                    
-                    # Check if any level was touched in this candle (with enhanced filters)
-                    levels_touched_now = []
-                    
-                    # Get minimum volume threshold if configured
-                    min_volume = self.config.get('alert_settings', {}).get('min_volume_threshold', 0)
-                    
-                    # Minimal delay between symbols (we have 10 calls/sec limit)
-                    time.sleep(0.01)  # 10ms delay
-                
-                    for level_type in key_levels:
-                        level_value = asset_data.levels.get_level(level_type)
-                        
-                        # Use enhanced touch detection with directional validation (volume filter removed)
-                        if self.touch_detector.check_level_touch_with_filters(
-                            candle, level_value, 
-                        recent_candles=asset_data.recent_candles[:-1] if len(asset_data.recent_candles) > 1 else [],
-                        min_volume=0,  # Volume filtering disabled
-                        level_type=level_type.value
-                    ):
-                            levels_touched_now.append((level_type, level_value))
-                    
-                    # If no levels touched, continue to next stock
-                    if not levels_touched_now:
-                        continue
-                    
-                    # Generate unique alert ID for this specific candle (use all levels to prevent multiple alerts)
-                    levels_touched_str = "_".join([lt.value for lt, _ in levels_touched_now])
-                    alert_id = f"{symbol}_{levels_touched_str}_{candle.timestamp}"
-                    
-                    # Skip if we already alerted for ANY level in this exact candle
-                    if alert_id in asset_data.alerted_levels:
-                        continue
-                    
-                    # Process the most significant level touched (priority: R1 > S1 > PIVOT)
-                    priority_order = {LevelType.R1: 3, LevelType.S1: 2, LevelType.PIVOT: 1}
-                    first_level_type, first_level_value = max(levels_touched_now, key=lambda x: priority_order.get(x[0], 0))
-                    
-                    # Use real current time for cooldown logic, not candle timestamp
-                    real_current_time = datetime.now()
-                    
-                    # Check if we can send alert (stock-wide cooldown logic)
-                    if self.cooldown_manager.can_send_alert(asset_data, first_level_type, real_current_time):
-                        # Get pending touches summary
-                        pending_touches, pending_levels = self.cooldown_manager.get_pending_touches_summary(asset_data)
-                        
-                        # Record that alert is being sent
-                        self.cooldown_manager.record_alert_sent(asset_data, first_level_type, real_current_time)
-                        
-                        # Get updated total touches
-                        total_touches = self.cooldown_manager.get_total_touches(asset_data)
-                        
-                        # Send alert with enhanced information
-                        success = self.telegram_service.send_formatted_alert(
-                            asset_data.name,
-                            first_level_type,
-                            first_level_value,
-                            candle,
-                            total_touches,
-                            pending_levels
-                        )
-                        
-                        if success:
-                            asset_data.alerted_levels.add(alert_id)
-                            asset_data.alerted_levels_timestamps[alert_id] = candle.timestamp
-                            
-                            # Clean up old alerts to prevent memory leak
-                            self._cleanup_old_alerts(asset_data, candle.timestamp)
-                            
-                            # Save to database
-                            self.db_service.save_alert(
-                                symbol, first_level_type.value, first_level_value,
-                                candle.close, candle.timestamp
-                            )
-                            
-                            # Log all levels touched with real detection time
-                            levels_str = ", ".join([f"{lt.value}({lv:.2f})" for lt, lv in levels_touched_now])
-                            detection_time_str = datetime.now().strftime('%H:%M:%S')
-                            logger.info(f"🎯 {asset_data.name} touched {levels_str} at {detection_time_str} "
-                                      f"(candle: {candle.time_str}) - Alert sent for {first_level_type.value} (Touch #{total_touches})")
-                            
-                            # Record other levels touched during this same candle (they go into cooldown too)
-                            for level_type, _ in levels_touched_now[1:]:
-                                self.cooldown_manager.record_touch_during_cooldown(asset_data, level_type)
-                        else:
-                            logger.error(f"Failed to send alert for {asset_data.name} {first_level_type.value}")
-                    
-                    else:
-                        # During cooldown period - record all level touches
-                        for level_type, level_value in levels_touched_now:
-                            self.cooldown_manager.record_touch_during_cooldown(asset_data, level_type)
-                        
-                        # Log the touches but mention stock is in cooldown
-                        time_until_next = self.cooldown_manager.get_time_until_next_alert(asset_data, real_current_time)
-                        cooldown_status = self.cooldown_manager.get_cooldown_status(asset_data, real_current_time)
-                        
-                        levels_str = ", ".join([f"{lt.value}({lv:.2f})" for lt, lv in levels_touched_now])
-                        detection_time_str = datetime.now().strftime('%H:%M:%S')
-                        logger.info(f"🔇 {asset_data.name} touched {levels_str} at {detection_time_str} "
-                                  f"(candle: {candle.time_str}) - STOCK in cooldown "
-                                  f"(Total touches: {cooldown_status['total_touches']}, next alert in {time_until_next})")
-                
-                except Exception as e:
-                    logger.error(f"Error checking levels for {symbol}: {e}")
+            # Record that alert is being sent
+            self.cooldown_manager.record_alert_sent(asset_data, first_level_type, 
+                                                   real_current_time, now_monotonic)
             
-            # Shorter delay between batches since we have high API limits
-            if i + batch_size < len(asset_items):
-                time.sleep(0.5)  # 500ms delay between batches (reduced from 2s)
+            # Get updated total touches
+            total_touches = self.cooldown_manager.get_total_touches(asset_data)
+            
+            # One message covers every level touched by this candle
+            self._queue_alert(AlertJob(symbol, asset_data.name, levels_touched_now, candle,
+                                       total_touches, pending_levels, real_current_time))
+        
+        else:
+            # During cooldown period - record all level touches
+            for level_type, level_value in levels_touched_now:
+                self.cooldown_manager.record_touch_during_cooldown(asset_data, level_type)
+            
+            # Log the touches but mention stock is in cooldown (skipped entirely above INFO)
+            if logger.isEnabledFor(logging.INFO):
+                time_until_next = self.cooldown_manager.get_time_until_next_alert(asset_data, now_monotonic)
+                logger.info("🔇 %s touched %s at %s (candle: %s) - STOCK in cooldown "
+                            "(Total touches: %s, next alert in %s)",
+                            asset_data.name, self._levels_str(levels_touched_now),
+                            real_current_time.strftime('%H:%M:%S'), candle.time_str,
+                            self.cooldown_manager.get_total_touches(asset_data), time_until_next)
+    
+    @staticmethod
+    def _levels_str(levels_touched: List[Tuple[LevelType, float]]) -> str:
+        """Format touched levels for logs, e.g. ``R1(110.00), PIVOT(100.00)``."""
+        return ", ".join(f"{level_type.value}({level_value:.2f})" for level_type, level_value in levels_touched)
+    
+    def _start_alert_sender(self):
+        """Start the thread that delivers queued alerts to Telegram."""
+        if self._alert_thread is None or not self._alert_thread.is_alive():
+            self._alert_thread = Thread(target=self._alert_sender_loop, name="alert-sender", daemon=True)
+            self._alert_thread.start()
+    
+    def _stop_alert_sender(self, timeout: float = ALERT_DRAIN_TIMEOUT):
+        """Deliver the alerts still queued, then stop the sender thread."""
+        if self._alert_thread is not None and self._alert_thread.is_alive():
+            self.alert_queue.put(None)
+            self._alert_thread.join(timeout)
+        self._alert_thread = None
     
-    def _cleanup_old_alerts(self, asset_data: AssetData, current_timestamp: int):
-        """Clean up old alert IDs to prevent memory leak."""
-        cleanup_threshold = current_timestamp - 3600  # Keep alerts for 1 hour
+    def _alert_sender_loop(self):
+        """Send queued alerts one at a time; TelegramService applies the chat rate limits."""
+        while True:
+            job = self.alert_queue.get()
+            if job is None:
+                # Jobs delivered since the last empty-queue flush are still buffered
+                self.db_service.flush_alerts()
+                return
+            try:
+                self._deliver_alert(job)
+                # Commit a burst of alerts in one transaction once the queue drains,
+                # keeping SQLite writes off the monitoring thread
+                if self.alert_queue.empty():
+                    self.db_service.flush_alerts()
+            except Exception as e:
+                logger.error("Error sending alert for %s: %s", job.asset_name, e)
+    
+    def _queue_alert(self, job: AlertJob):
+        """Hand an alert to the sender thread, or send it inline when monitoring is not running."""
+        if self._alert_thread is None or not self._alert_thread.is_alive():
+            self._deliver_alert(job)
+            return
+        try:
+            self.alert_queue.put_nowait(job)
+        except queue.Full:
+            logger.error("Alert queue full, dropping alert for %s", job.asset_name)
+    
+    def _deliver_alert(self, job: AlertJob):
+        """Send one alert and record its levels once Telegram accepts it."""
+        first_level_type = job.levels_touched[0][0]
+        candle = job.candle
+        success = self.telegram_service.send_multi_level_alert(
+            job.asset_name,
+            job.levels_touched,
+            candle,
+            job.total_touches,
+            job.pending_levels,
+            detection_time=job.detected_at
+        )
         
-        alerts_to_remove = []
-        for alert_id, timestamp in asset_data.alerted_levels_timestamps.items():
-            if timestamp < cleanup_threshold:
-                alerts_to_remove.append(alert_id)
+        if not success:
+            logger.error("Failed to send alert for %s %s", job.asset_name, first_level_type.value)
+            return
         
-        for alert_id in alerts_to_remove:
-            asset_data.alerted_levels.discard(alert_id)
-            asset_data.alerted_levels_timestamps.pop(alert_id, None)
+        # Save every level reported in the alert
+        for level_type, level_value in job.levels_touched:
+            self.db_service.save_alert(
+                job.symbol, level_type.value, level_value,
+                candle.close, candle.timestamp
+            )
         
-        if alerts_to_remove:
-            logger.debug(f"Cleaned up {len(alerts_to_remove)} old alert IDs for {asset_data.symbol}")
+        # Log all levels touched with real detection time
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🎯 %s touched %s at %s (candle: %s) - Alert sent for %s (Touch #%s)",
+                        job.asset_name, self._levels_str(job.levels_touched),
+                        job.detected_at.strftime('%H:%M:%S'), candle.time_str,
+                        first_level_type.value, job.total_touches)
     
     def _reset_daily_data(self):
-        """Reset daily tracking data including stock-wide cooldowns."""
-        with self._lock:
-            for asset_data in self.asset_data.values():
-                asset_data.alerted_levels.clear()
-                asset_data.alerted_levels_timestamps.clear()
-                asset_data.recent_candles.clear()
-                asset_data.last_candle_timestamp = 0
-                # Reset stock-wide cooldown for new trading day
-                self.cooldown_manager.reset_daily_cooldowns(asset_data)
-            
-            logger.info("🔄 Daily data and stock-wide cooldowns reset completed")
+        """Reset daily tracking data including stock-wide cooldowns.
+        
+        Only the generation is bumped here; each asset clears its own data the next
+        time it is processed, so the reset never walks every asset.
+        """
+        self._generation += 1
+        self.cooldown_manager.active_assets = {}
+        
+        logger.info("🔄 Daily data and stock-wide cooldowns reset completed")
+    
+    def _reset_asset(self, asset_data: AssetData):
+        """Clear one asset's tracking data left over from an earlier generation."""
+        asset_data.recent_candles.clear()
+        asset_data.last_candle_timestamp = 0
+        # Reset stock-wide cooldown for new trading day
+        self.cooldown_manager.reset_daily_cooldowns(asset_data)
+        asset_data.generation = self._generation
     
     def stop_monitoring(self):
         """Stop the monitoring loop."""
         self.is_running = False
+        self._stop_event.set()
+        self.db_service.flush_alerts()
         logger.info("🛑 Stopping monitoring...")
     
     def get_status_report(self) -> str:
@@ -1500,10 +2417,12 @@ class CPRAlertBot:
         report += f"📈 Monitoring: {len(self.asset_data)} assets\n"
         report += f"⏰ Cooldown: {self.cooldown_manager.cooldown_minutes} min per STOCK (all levels)\n\n"
         
-        # Show only assets with recent activity
+        # Show only assets with recent activity; the cooldown manager already tracks them.
+        # Snapshot first: the monitoring thread adds entries while this runs on the CLI thread
         active_assets = []
-        for symbol, data in self.asset_data.items():
-            levels = data.levels
+        for symbol, data in list(self.cooldown_manager.active_assets.items()):
+            if self.asset_data.get(symbol) is not data:
+                continue  # Replaced by a later initialize_daily_levels()
             total_touches = self.cooldown_manager.get_total_touches(data)
             
             if total_touches > 0:
@@ -1513,17 +2432,17 @@ class CPRAlertBot:
             report += "🎯 **Active Assets Today:**\n"
             for symbol, data, total_touches in sorted(active_assets, key=lambda x: x[2], reverse=True):
                 levels = data.levels
-                cooldown_status = self.cooldown_manager.get_cooldown_status(data, current_time)
+                cooldown_status = self.cooldown_manager.get_cooldown_status(data)
                 
                 report += f"*{data.name}*\n"
                 report += f"S1={levels.s1:.1f} | P={levels.pivot:.1f} | R1={levels.r1:.1f}\n"
                 report += f"Total touches: {total_touches}\n"
                 
-                if cooldown_status["in_cooldown"]:
-                    minutes_left = int(cooldown_status["time_remaining"].total_seconds() / 60)
+                if cooldown_status.in_cooldown:
+                    minutes_left = int(cooldown_status.time_remaining.total_seconds() / 60)
                     report += f"🔇 Stock in cooldown: {minutes_left}m left\n"
-                    if cooldown_status["levels_touched_during_cooldown"]:
-                        report += f"Pending levels: {', '.join(cooldown_status['levels_touched_during_cooldown'])}\n"
+                    if cooldown_status.levels_touched_during_cooldown:
+                        report += f"Pending levels: {', '.join(cooldown_status.levels_touched_during_cooldown)}\n"
                 else:
                     report += f"✅ Ready for alerts\n"
                 
@@ -1574,7 +2493,8 @@ def create_sample_config():
             "focus_on_key_levels": True,
             "min_volume_threshold": 0,
             "enable_spam_prevention": True,
-            "strict_level_crossing": True
+            "strict_level_crossing": True,
+            "use_live_feed": False
         }
     }
     
@@ -1592,6 +2512,25 @@ class CLIInterface:
     
     def __init__(self, bot: CPRAlertBot):
         self.bot = bot
+        self._monitor_thread: Optional[Thread] = None
+    
+    def _stop_monitor_thread(self):
+        """Stop monitoring and wait for the loop to finish delivering queued alerts.
+        
+        The loop first finishes its current scan (fetches wait up to CANDLE_TOKEN_TIMEOUT
+        for a rate-limit token), then gives the alert sender up to ALERT_DRAIN_TIMEOUT to
+        drain, so the wait is bounded by MONITOR_STOP_TIMEOUT rather than hanging on a stuck call.
+        """
+        self.bot.stop_monitoring()
+        if self._monitor_thread is not None:
+            self._monitor_thread.join(MONITOR_STOP_TIMEOUT)
+            if self._monitor_thread.is_alive():
+                # Daemon thread: it is abandoned rather than blocking the CLI; queued alerts may be lost
+                logger.warning("⚠️ Monitor thread still running after %ss; continuing without it",
+                               MONITOR_STOP_TIMEOUT)
+            self._monitor_thread = None
+        # Rows saved while the queue drained were buffered after stop_monitoring()'s flush
+        self.bot.db_service.flush_alerts()
     
     def run_interactive(self):
         """Run interactive CLI."""
@@ -1603,22 +2542,27 @@ class CLIInterface:
                 command = input("\nEnter command: ").strip().lower()
                 
                 if command == "quit" or command == "exit":
+                    self._stop_monitor_thread()
                     print("Goodbye!")
                     break
                 elif command == "status":
                     print(self.bot.get_status_report())
                 elif command == "start":
-                    if not self.bot.asset_data:
-                        print("Initializing levels...")
-                        if self.bot.initialize_daily_levels():
-                            print("Starting monitoring...")
-                            Thread(target=self.bot.start_monitoring, daemon=True).start()
-                        else:
-                            print("Failed to initialize levels")
-                    else:
+                    if self._monitor_thread is not None and self._monitor_thread.is_alive():
                         print("Bot is already running")
+                    else:
+                        if not self.bot.asset_data:
+                            print("Initializing levels...")
+                            if not self.bot.initialize_daily_levels():
+                                print("Failed to initialize levels")
+                                continue
+                        print("Starting monitoring...")
+                        # The loop waits on the bot's stop event, so this thread idles between ticks
+                        self._monitor_thread = Thread(target=self.bot.start_monitoring,
+                                                      name="monitoring", daemon=True)
+                        self._monitor_thread.start()
                 elif command == "stop":
-                    self.bot.stop_monitoring()
+                    self._stop_monitor_thread()
                     print("Monitoring stopped")
                 elif command == "config":
                     create_sample_config()
@@ -1626,14 +2570,15 @@ class CLIInterface:
                     symbol = input("Enter symbol (e.g., 'NSE:NIFTY50-INDEX'): ").strip()
                     if symbol in self.bot.asset_data:
                         asset_data = self.bot.asset_data[symbol]
-                        cooldown_status = self.bot.cooldown_manager.get_cooldown_status(asset_data, datetime.now())
+                        cooldown_status = self.bot.cooldown_manager.get_cooldown_status(asset_data)
                         
-                        if cooldown_status["in_cooldown"]:
-                            minutes = int(cooldown_status["time_remaining"].total_seconds() / 60)
+                        # A daily reset not yet applied to this asset means it has no cooldown
+                        if cooldown_status.in_cooldown and asset_data.generation == self.bot._generation:
+                            minutes = int(cooldown_status.time_remaining.total_seconds() / 60)
                             print(f"🔇 {symbol} in cooldown: {minutes} minutes remaining")
-                            print(f"Initial level: {cooldown_status['initial_level']}")
-                            if cooldown_status["levels_touched_during_cooldown"]:
-                                print(f"Also touched: {', '.join(cooldown_status['levels_touched_during_cooldown'])}")
+                            print(f"Initial level: {cooldown_status.initial_level}")
+                            if cooldown_status.levels_touched_during_cooldown:
+                                print(f"Also touched: {', '.join(cooldown_status.levels_touched_during_cooldown)}")
                         else:
                             print(f"✅ {symbol} ready for alerts")
                     else:
@@ -1658,6 +2603,7 @@ class CLIInterface:
                     
             except KeyboardInterrupt:
                 print("\nExiting...")
+                self._stop_monitor_thread()
                 break
             except Exception as e:
                 print(f"Error: {e}")
@@ -1690,7 +2636,7 @@ def main():
             bot.stop_monitoring()
             
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         raise
 
 def interactive_main():
@@ -1706,7 +2652,7 @@ def interactive_main():
         cli.run_interactive()
         
     except Exception as e:
-        logger.error(f"Error in interactive mode: {e}")
+        logger.error("Error in interactive mode: %s", e)
 
 def test_connection():
     """Test Fyers and Telegram connections."""
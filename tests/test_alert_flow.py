@@ -0,0 +1,151 @@
+import sqlite3
+import time
+from datetime import date, datetime
+
+import pytest
+
+import cpr_bot
+from cpr_bot import AssetConfig, CandleData, CPRAlertBot, DatabaseService, LevelType, OHLCData
+
+SYMBOL = "NSE:A-EQ"
+SOURCE = OHLCData(100.0, 110.0, 90.0, 100.0, date(2025, 1, 3))  # PIVOT 100, R1 110, S1 90
+T0 = 1_700_000_000
+
+
+class FakeTelegram:
+    def __init__(self, config):
+        self.alerts = []
+        self.messages = []
+        self.fail = False
+    
+    def send_alert(self, message, max_retries=3):
+        self.messages.append(message)
+        return True
+    
+    def send_multi_level_alert(self, asset_name, levels_touched, candle, total_touches,
+                               pending_levels, detection_time=None):
+        if self.fail:
+            return False
+        self.alerts.append((asset_name, [level_type for level_type, _ in levels_touched]))
+        return True
+
+
+class FakeFyers:
+    def __init__(self, config):
+        self.history = {}
+    
+    def get_historical_ohlc(self, symbol, target_date, use_quotes_fallback=True):
+        return self.history.get(symbol)
+    
+    def get_quote_estimates(self, symbols, target_date):
+        return {}
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    config = {
+        "alert_settings": {"tolerance_percent": 0.15, "cooldown_minutes": 30},
+        "assets": [AssetConfig(SYMBOL, "A"), AssetConfig("NSE:B-EQ", "B")],
+        "fyers": {},
+        "telegram": {},
+    }
+    monkeypatch.setattr(cpr_bot.ConfigManager, "load_config", staticmethod(lambda: config))
+    monkeypatch.setattr(cpr_bot, "FyersService", FakeFyers)
+    monkeypatch.setattr(cpr_bot, "TelegramService", FakeTelegram)
+    monkeypatch.setattr(cpr_bot, "DatabaseService", lambda: DatabaseService(tmp_path / "bot.db"))
+    bot = CPRAlertBot()
+    yield bot
+    bot.candle_executor.shutdown(wait=False)
+
+
+def make_candle(minute, high, low, close):
+    timestamp = T0 + 60 * minute
+    moment = datetime.fromtimestamp(timestamp)
+    return CandleData(timestamp, close, high, low, close, 0, moment, moment.strftime("%H:%M"))
+
+
+def seeded_bot(bot):
+    bot.fyers_service.history[SYMBOL] = SOURCE
+    assert bot.initialize_daily_levels()
+    return bot.asset_data[SYMBOL]
+
+
+def pivot_touch(bot, asset, minute=1):
+    """Feed a candle above the pivot, then one that dips onto it."""
+    bot._process_candle(SYMBOL, asset, make_candle(minute - 1, 106.0, 103.0, 105.0))
+    bot._process_candle(SYMBOL, asset, make_candle(minute, 104.0, 99.97, 100.2))
+
+
+def stored_alerts(bot):
+    bot.db_service.flush_alerts()
+    return sqlite3.connect(bot.db_service.db_path).execute(
+        "SELECT symbol, level_type FROM alerts").fetchall()
+
+
+def test_initialize_daily_levels_skips_failed_assets(bot):
+    asset = seeded_bot(bot)
+    
+    assert list(bot.asset_data) == [SYMBOL]
+    assert asset.levels.pivot == pytest.approx(100.0)
+    assert asset.key_level_rows
+    assert bot.telegram_service.messages[-1].startswith("🎯 **CPR Levels")
+
+
+def test_touch_sends_one_alert_and_saves_it(bot):
+    asset = seeded_bot(bot)
+    pivot_touch(bot, asset)
+    
+    assert bot.telegram_service.alerts == [("A", [LevelType.PIVOT])]
+    assert stored_alerts(bot) == [(SYMBOL, "PIVOT")]
+
+
+def test_touch_during_cooldown_is_recorded_not_sent(bot):
+    asset = seeded_bot(bot)
+    pivot_touch(bot, asset)
+    bot._process_candle(SYMBOL, asset, make_candle(2, 103.0, 99.98, 102.0))
+    
+    assert len(bot.telegram_service.alerts) == 1
+    assert bot.cooldown_manager.get_total_touches(asset) == 2
+    assert not bot.cooldown_manager.can_send_alert(asset, LevelType.S1)
+    assert bot.cooldown_manager.can_send_alert(asset, LevelType.S1, time.monotonic() + 31 * 60)
+
+
+def test_same_candle_is_processed_once(bot):
+    asset = seeded_bot(bot)
+    pivot_touch(bot, asset)
+    bot._process_candle(SYMBOL, asset, make_candle(1, 104.0, 99.97, 100.2))
+    
+    assert bot.cooldown_manager.get_total_touches(asset) == 1
+
+
+def test_failed_send_keeps_cooldown_and_saves_nothing(bot):
+    asset = seeded_bot(bot)
+    bot.telegram_service.fail = True
+    pivot_touch(bot, asset)
+    
+    # The cooldown is recorded before sending, so a failed send is not retried
+    assert stored_alerts(bot) == []
+    assert not bot.cooldown_manager.can_send_alert(asset, LevelType.PIVOT)
+
+
+def test_queued_alerts_are_delivered_and_flushed_on_stop(bot):
+    asset = seeded_bot(bot)
+    bot._start_alert_sender()
+    pivot_touch(bot, asset)
+    bot._stop_alert_sender(timeout=5)
+    
+    assert bot.telegram_service.alerts == [("A", [LevelType.PIVOT])]
+    assert sqlite3.connect(bot.db_service.db_path).execute(
+        "SELECT COUNT(*) FROM alerts").fetchone()[0] == 1
+
+
+def test_full_queue_drops_alert(bot, monkeypatch):
+    asset = seeded_bot(bot)
+    bot.alert_queue = cpr_bot.queue.Queue(maxsize=1)
+    bot.alert_queue.put_nowait(object())
+    # Looks like a running sender so the alert is queued instead of sent inline
+    monkeypatch.setattr(bot, "_alert_thread", type("Alive", (), {"is_alive": lambda self: True})())
+    pivot_touch(bot, asset)
+    
+    assert bot.telegram_service.alerts == []
+    assert bot.alert_queue.qsize() == 1
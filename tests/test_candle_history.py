@@ -0,0 +1,35 @@
+from cpr_bot import CandleData, CandleHistory
+
+
+def candle(high, low, close):
+    return CandleData(0, low, high, low, close, 0, None, "")
+
+
+def test_previous_needs_two_candles():
+    history = CandleHistory()
+    assert history.previous() is None
+    history.append(candle(11.0, 9.0, 10.0))
+    assert len(history) == 1
+    assert history.previous() is None
+
+
+def test_ring_overwrites_oldest():
+    history = CandleHistory()
+    for i in range(5):
+        history.append(candle(10.0 + i, 5.0 + i, 7.0 + i))
+        if i:
+            # Always the candle before the latest one
+            assert history.previous() == (9.0 + i, 4.0 + i, 6.0 + i)
+    assert len(history) == history.capacity == 2
+
+
+def test_larger_capacity_and_clear():
+    history = CandleHistory(capacity=3)
+    for i in range(4):
+        history.append(candle(float(i), float(i), float(i)))
+    assert len(history) == 3
+    assert history.previous() == (2.0, 2.0, 2.0)
+    
+    history.clear()
+    assert len(history) == 0
+    assert history.previous() is None
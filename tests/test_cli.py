@@ -0,0 +1,40 @@
+import logging
+from threading import Event, Thread
+from types import SimpleNamespace
+
+import cpr_bot
+from cpr_bot import CLIInterface
+
+
+def make_cli():
+    flushed = []
+    bot = SimpleNamespace(stop_monitoring=lambda: None,
+                          db_service=SimpleNamespace(flush_alerts=lambda: flushed.append(True)))
+    return CLIInterface(bot), flushed
+
+
+def test_stop_monitor_thread_joins_finished_loop():
+    cli, flushed = make_cli()
+    cli._monitor_thread = Thread(target=lambda: None, daemon=True)
+    cli._monitor_thread.start()
+    
+    cli._stop_monitor_thread()
+    
+    assert cli._monitor_thread is None
+    assert flushed == [True]
+
+
+def test_stop_monitor_thread_gives_up_on_stuck_loop(monkeypatch, caplog):
+    monkeypatch.setattr(cpr_bot, "MONITOR_STOP_TIMEOUT", 0.05)
+    release = Event()
+    cli, flushed = make_cli()
+    cli._monitor_thread = Thread(target=release.wait, daemon=True)
+    cli._monitor_thread.start()
+    
+    with caplog.at_level(logging.WARNING, logger="cpr_bot"):
+        cli._stop_monitor_thread()
+    release.set()
+    
+    assert cli._monitor_thread is None
+    assert flushed == [True]
+    assert "still running" in caplog.text
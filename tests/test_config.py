@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+import cpr_bot
+from cpr_bot import AssetConfig, ConfigManager
+
+
+def write_config(path, assets):
+    path.write_text(json.dumps({
+        "fyers": {"app_id": "APP", "access_token": "TOKEN"},
+        "telegram": {"bot_token": "BOT", "chat_id": "1"},
+        "alert_settings": {},
+        "assets": assets,
+    }))
+
+
+def test_file_assets_load_as_asset_configs(tmp_path, monkeypatch):
+    config_file = tmp_path / "config.json"
+    write_config(config_file, [{"symbol": "NSE:A-EQ", "name": "Alpha"}, {"symbol": "NSE:B-EQ"}])
+    monkeypatch.setattr(cpr_bot, "CONFIG_FILE", config_file)
+    
+    config = ConfigManager.load_config()
+    
+    # An entry without a name keeps loading, named after its symbol
+    assert config["assets"] == [AssetConfig("NSE:A-EQ", "Alpha"), AssetConfig("NSE:B-EQ", "NSE:B-EQ")]
+
+
+def test_asset_without_symbol_is_rejected(tmp_path, monkeypatch):
+    config_file = tmp_path / "config.json"
+    write_config(config_file, [{"name": "Nameless"}])
+    monkeypatch.setattr(cpr_bot, "CONFIG_FILE", config_file)
+    
+    with pytest.raises(ValueError):
+        ConfigManager.load_config()
+
+
+def test_environment_stock_list(tmp_path, monkeypatch):
+    monkeypatch.setattr(cpr_bot, "CONFIG_FILE", tmp_path / "missing.json")
+    monkeypatch.setenv("STOCKS_CONFIG", "NSE:NIFTY50-INDEX:NIFTY 50,NSE:RELIANCE-EQ")
+    for key in ("FYERS_APP_ID", "FYERS_SECRET_KEY", "FYERS_ACCESS_TOKEN", "TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID"):
+        monkeypatch.setenv(key, "x")
+    
+    config = ConfigManager.load_config()
+    
+    assert config["assets"] == [AssetConfig("NSE:NIFTY50-INDEX", "NIFTY 50"),
+                                AssetConfig("NSE:RELIANCE-EQ", "RELIANCE")]
@@ -0,0 +1,15 @@
+from datetime import date
+
+import pytest
+
+from cpr_bot import CPRCalculator, OHLCData
+
+
+def test_calculate_levels():
+    levels = CPRCalculator.calculate_levels(OHLCData(100.0, 110.0, 90.0, 106.0, date(2025, 1, 3)))
+    
+    assert levels.pivot == pytest.approx(102.0)
+    assert levels.bc == pytest.approx(100.0)
+    assert levels.tc == pytest.approx(104.0)
+    assert levels.r1 == pytest.approx(114.0)
+    assert levels.s1 == pytest.approx(94.0)
@@ -0,0 +1,169 @@
+import json
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from cpr_bot import CPRCalculator, DatabaseService, OHLCData
+
+# daily_levels as created by releases before the scalar source columns
+LEGACY_DAILY_LEVELS = '''
+    CREATE TABLE daily_levels (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        date TEXT NOT NULL,
+        pivot REAL NOT NULL,
+        tc REAL NOT NULL,
+        bc REAL NOT NULL,
+        r1 REAL NOT NULL,
+        s1 REAL NOT NULL,
+        source_ohlc TEXT NOT NULL,
+        UNIQUE(symbol, date)
+    )
+'''
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_DAILY_LEVELS)
+    source = {"open": 100.0, "high": 110.0, "low": 90.0, "close": 105.0, "volume": 1000,
+              "source": "historical", "date": "2025-01-03"}
+    rows = [
+        ("NSE:A-EQ", "2025-01-03", json.dumps(source)),
+        ("NSE:B-EQ", "2025-01-03", "{not json"),
+        ("NSE:C-EQ", "2025-01-03", "[1, 2, 3]"),
+        ("NSE:D-EQ", "2025-01-03", json.dumps({"open": 50.0})),
+    ]
+    conn.executemany('''
+        INSERT INTO daily_levels (symbol, date, pivot, tc, bc, r1, s1, source_ohlc)
+        VALUES (?, ?, 101.0, 102.0, 100.0, 112.0, 92.0, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_legacy_daily_levels_are_migrated(legacy_db):
+    DatabaseService(legacy_db)
+    
+    conn = sqlite3.connect(legacy_db)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(daily_levels)")}
+    assert "source_ohlc" not in columns
+    assert {"src_open", "src_high", "src_low", "src_close", "src_volume", "src_source"} <= columns
+    
+    rows = dict((row[0], row[1:]) for row in conn.execute(
+        "SELECT symbol, pivot, src_open, src_high, src_low, src_close, src_volume, src_source "
+        "FROM daily_levels"))
+    assert rows["NSE:A-EQ"] == (101.0, 100.0, 110.0, 90.0, 105.0, 1000, "historical")
+    # Missing keys become NULLs rather than failing the row
+    assert rows["NSE:D-EQ"] == (101.0, 50.0, None, None, None, None, None)
+
+
+def test_unreadable_legacy_rows_are_skipped_not_fatal(legacy_db):
+    DatabaseService(legacy_db)
+    
+    conn = sqlite3.connect(legacy_db)
+    symbols = {row[0] for row in conn.execute("SELECT symbol FROM daily_levels")}
+    assert symbols == {"NSE:A-EQ", "NSE:D-EQ"}
+
+
+def test_migration_runs_once(legacy_db):
+    DatabaseService(legacy_db)
+    # A second start sees the new schema and leaves the data alone
+    DatabaseService(legacy_db)
+    
+    conn = sqlite3.connect(legacy_db)
+    assert conn.execute("SELECT COUNT(*) FROM daily_levels").fetchone()[0] == 2
+
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseService(tmp_path / "alerts.db", flush_rows=3, flush_interval_seconds=3600)
+
+
+def stored_alerts(db):
+    return sqlite3.connect(db.db_path).execute("SELECT symbol, level_type FROM alerts ORDER BY id").fetchall()
+
+
+def test_wal_mode_enabled(db):
+    assert db._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_alerts_are_buffered_until_flush_rows(db):
+    db.save_alert("NSE:A-EQ", "R1", 110.0, 110.1, 1)
+    db.save_alert("NSE:A-EQ", "S1", 90.0, 90.1, 2)
+    assert stored_alerts(db) == []
+    
+    db.save_alert("NSE:B-EQ", "PIVOT", 100.0, 100.1, 3)
+    assert stored_alerts(db) == [("NSE:A-EQ", "R1"), ("NSE:A-EQ", "S1"), ("NSE:B-EQ", "PIVOT")]
+
+
+def test_alerts_are_flushed_after_interval(tmp_path):
+    db = DatabaseService(tmp_path / "alerts.db", flush_rows=100, flush_interval_seconds=30)
+    db._last_flush -= 31
+    db.save_alert("NSE:A-EQ", "R1", 110.0, 110.1, 1)
+    assert stored_alerts(db) == [("NSE:A-EQ", "R1")]
+
+
+def test_flush_alerts_writes_partial_buffer_once(db):
+    db.save_alert("NSE:A-EQ", "R1", 110.0, 110.1, 1)
+    db.flush_alerts()
+    db.flush_alerts()
+    # Duplicate (symbol, level, timestamp) rows are ignored
+    db.save_alert("NSE:A-EQ", "R1", 110.0, 110.1, 1)
+    db.flush_alerts()
+    assert stored_alerts(db) == [("NSE:A-EQ", "R1")]
+
+
+def test_daily_levels_bulk_skips_unchanged(db, monkeypatch):
+    ohlc = OHLCData(100.0, 110.0, 90.0, 105.0, date(2025, 1, 3))
+    levels = CPRCalculator.calculate_levels(ohlc)
+    db.save_daily_levels_bulk("2025-01-06", [("NSE:A-EQ", levels, ohlc), ("NSE:B-EQ", levels, ohlc)])
+    
+    written = []
+    monkeypatch.setattr(db, "_conn", RecordingConnection(db._conn, written))
+    db.save_daily_levels_bulk("2025-01-06", [("NSE:A-EQ", levels, ohlc)])
+    assert written == []
+    
+    moved = CPRCalculator.calculate_levels(OHLCData(100.0, 120.0, 90.0, 105.0, date(2025, 1, 3)))
+    db.save_daily_levels_bulk("2025-01-06", [("NSE:A-EQ", moved, ohlc)])
+    assert len(written) == 1
+    
+    rows = sqlite3.connect(db.db_path).execute(
+        "SELECT symbol, r1 FROM daily_levels ORDER BY symbol").fetchall()
+    assert rows == [("NSE:A-EQ", moved.r1), ("NSE:B-EQ", levels.r1)]
+
+
+def test_ohlc_cache_round_trip(db):
+    target = date.today() - timedelta(days=3)
+    ohlc = OHLCData(100.0, 110.0, 90.0, 105.0, target - timedelta(days=1), volume=1000)
+    db.cache_ohlc("NSE:A-EQ", target, ohlc)
+    assert db.get_cached_ohlc("NSE:A-EQ", target) == ohlc
+    assert db.get_cached_ohlc("NSE:B-EQ", target) is None
+
+
+def test_ohlc_cache_skips_estimates_and_today(db):
+    target = date.today() - timedelta(days=3)
+    db.cache_ohlc("NSE:A-EQ", target, OHLCData(1.0, 1.0, 1.0, 1.0, target, source="quotes_estimate"))
+    assert db.get_cached_ohlc("NSE:A-EQ", target) is None
+    
+    today = date.today()
+    db.cache_ohlc("NSE:A-EQ", today, OHLCData(1.0, 1.0, 1.0, 1.0, today))
+    assert db.get_cached_ohlc("NSE:A-EQ", today) is None
+
+
+class RecordingConnection:
+    """Wraps a sqlite3 connection and records executemany() calls."""
+    
+    def __init__(self, conn, calls):
+        self._conn = conn
+        self._calls = calls
+    
+    def executemany(self, sql, rows):
+        self._calls.append(list(rows))
+        return self._conn.executemany(sql, rows)
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
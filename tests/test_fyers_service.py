@@ -0,0 +1,140 @@
+import time
+from datetime import date, datetime
+
+import pytest
+
+import cpr_bot
+from cpr_bot import FyersService
+
+TARGET = date(2025, 1, 3)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    # No SDK client: every network call is replaced per test
+    monkeypatch.setattr(FyersService, "_initialize_client", lambda self: None)
+    return FyersService({"app_id": "APP", "access_token": "TOKEN"})
+
+
+def daily_response(day: date, ohlc=(100.0, 110.0, 90.0, 105.0)):
+    timestamp = int(datetime(day.year, day.month, day.day, 9, 15).timestamp())
+    return {"s": "ok", "candles": [[timestamp, *ohlc, 1000]]}
+
+
+def test_failed_candle_fetch_backs_off_candles_only(service):
+    candle_calls = []
+    service._fetch_latest_candle = lambda symbol, resolution: candle_calls.append(symbol)
+    service._request_daily_range = lambda symbol, target_date, resolution: daily_response(target_date)
+    
+    assert service.get_latest_candle("NSE:A-EQ") is None
+    assert service.get_latest_candle("NSE:A-EQ") is None
+    assert candle_calls == ["NSE:A-EQ"]  # Second call skipped while backing off
+    
+    # The daily recalc still fetches history for the same symbol
+    ohlc = service.get_historical_ohlc("NSE:A-EQ", TARGET, use_quotes_fallback=False)
+    assert ohlc is not None and ohlc.source == "historical" and ohlc.date == TARGET
+
+
+def test_failed_history_fetch_does_not_block_candles(service):
+    service._request_daily_range = lambda symbol, target_date, resolution: {}
+    assert service.get_historical_ohlc("NSE:A-EQ", TARGET, use_quotes_fallback=False) is None
+    assert service._in_backoff(service._history_backoff, "NSE:A-EQ")
+    
+    sentinel = object()
+    service._fetch_latest_candle = lambda symbol, resolution: sentinel
+    assert service.get_latest_candle("NSE:A-EQ") is sentinel
+
+
+def test_backoff_grows_and_clears_on_success(service, monkeypatch):
+    monkeypatch.setattr(cpr_bot.random, "uniform", lambda a, b: 0.0)
+    backoffs = {}
+    start = time.monotonic()
+    
+    FyersService._record_fetch_result(backoffs, "NSE:A-EQ", False)
+    FyersService._record_fetch_result(backoffs, "NSE:A-EQ", False)
+    retry_at, failures = backoffs["NSE:A-EQ"]
+    assert failures == 2
+    assert retry_at - start >= cpr_bot.FAILURE_BACKOFF_BASE * 2
+    
+    for _ in range(20):
+        FyersService._record_fetch_result(backoffs, "NSE:A-EQ", False)
+    retry_at, _ = backoffs["NSE:A-EQ"]
+    assert retry_at - time.monotonic() <= cpr_bot.FAILURE_BACKOFF_MAX
+    
+    FyersService._record_fetch_result(backoffs, "NSE:A-EQ", True)
+    assert "NSE:A-EQ" not in backoffs
+
+
+def test_token_bucket_allows_a_burst_then_refuses(service):
+    service.refill_rate = 1e-9  # No meaningful refill during the test
+    for _ in range(service.bucket_capacity):
+        assert service._check_api_rate_limit()
+    assert not service._check_api_rate_limit()
+
+
+def test_token_bucket_refills_over_time(service):
+    service.tokens = 0.0
+    service.last_refill = time.monotonic() - 0.5
+    # Half a second at 10 tokens/s
+    assert service._check_api_rate_limit()
+    assert int(service.tokens) == 4
+
+
+def test_minute_cap_applies_with_tokens_left(service):
+    service.max_calls = 3
+    now = time.monotonic()
+    service._recent_calls.extend([now - 70, now - 5, now - 4, now - 3])
+    with service._rate_lock:
+        wait_time = service._take_api_token()
+    # The 70s-old call left the window; the oldest remaining one frees a slot in ~55s
+    assert 54 < wait_time <= 55
+    assert len(service._recent_calls) == 3
+
+
+def test_acquire_times_out(service):
+    service.max_calls = 1
+    service._recent_calls.append(time.monotonic())
+    started = time.monotonic()
+    assert not service._check_api_rate_limit(wait=True, timeout=0.05)
+    assert time.monotonic() - started < 1
+
+
+class QuotesClient:
+    def __init__(self):
+        self.requests = []
+    
+    def quotes(self, data):
+        symbols = data["symbols"].split(",")
+        self.requests.append(symbols)
+        return {"s": "ok", "d": [
+            {"n": symbol, "v": {"prev_close_price": 100.0} if not symbol.endswith("X") else {}}
+            for symbol in symbols
+        ]}
+
+
+def test_quote_estimates_are_batched(service, monkeypatch):
+    monkeypatch.setattr(cpr_bot, "QUOTES_BATCH_SIZE", 2)
+    service.client = QuotesClient()
+    symbols = ["NSE:A-EQ", "NSE:B-EQ", "NSE:C-EQ", "NSE:X"]
+    
+    estimates = service.get_quote_estimates(symbols, TARGET)
+    
+    assert service.client.requests == [["NSE:A-EQ", "NSE:B-EQ"], ["NSE:C-EQ", "NSE:X"]]
+    # Entries without a previous close are left out
+    assert sorted(estimates) == ["NSE:A-EQ", "NSE:B-EQ", "NSE:C-EQ"]
+    ohlc = estimates["NSE:A-EQ"]
+    assert ohlc.source == "quotes_estimate" and ohlc.date == TARGET
+    assert (ohlc.low, ohlc.close, ohlc.high) == pytest.approx((99.0, 100.0, 101.0))
+
+
+def test_quote_estimates_skip_failed_batches(service, monkeypatch):
+    monkeypatch.setattr(cpr_bot, "QUOTES_BATCH_SIZE", 1)
+    client = QuotesClient()
+    
+    def quotes(data):
+        if data["symbols"] == "NSE:A-EQ":
+            raise ConnectionError("reset")
+        return client.quotes(data)
+    
+    service.client = type("Client", (), {"quotes": staticmethod(quotes)})()
+    assert list(service.get_quote_estimates(["NSE:A-EQ", "NSE:B-EQ"], TARGET)) == ["NSE:B-EQ"]
@@ -0,0 +1,42 @@
+import inspect
+import re
+
+import requests
+from fyers_apiv3 import fyersModel
+
+from cpr_bot import PooledFyersTransport
+
+
+def sdk_requests_attributes():
+    """Every ``requests.<name>`` the SDK module refers to."""
+    return set(re.findall(r"\brequests\.([A-Za-z_]\w*)", inspect.getsource(fyersModel)))
+
+
+def test_sdk_still_patches_through_a_module_global():
+    # The shim replaces fyersModel.requests; the SDK must still look it up there
+    assert hasattr(fyersModel, "requests")
+    assert {"get", "post"} <= sdk_requests_attributes()
+
+
+def test_shim_resolves_everything_the_sdk_uses():
+    transport = PooledFyersTransport()
+    try:
+        for name in sdk_requests_attributes():
+            assert getattr(transport, name) is not None, name
+        assert transport.HTTPError is requests.HTTPError
+        assert transport.exceptions is requests.exceptions
+    finally:
+        transport.close()
+
+
+def test_http_calls_go_through_the_pooled_session(monkeypatch):
+    transport = PooledFyersTransport()
+    calls = []
+    monkeypatch.setattr(transport.session, "request",
+                        lambda method, url, **kwargs: calls.append((method, url)) or "response")
+    try:
+        assert transport.get("https://api.example/x", params={}) == "response"
+        assert transport.post("https://api.example/y", json={}) == "response"
+        assert calls == [("GET", "https://api.example/x"), ("POST", "https://api.example/y")]
+    finally:
+        transport.close()
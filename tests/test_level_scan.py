@@ -0,0 +1,100 @@
+import itertools
+from datetime import datetime
+
+import pytest
+
+from cpr_bot import (KEY_LEVELS, LEVEL_BITS, CandleData, CandleHistory, CPRCalculator,
+                     LevelRow, LevelTouchDetector, OHLCData)
+
+DETECTOR = LevelTouchDetector(tolerance_percent=0.15)
+LEVELS = CPRCalculator.calculate_levels(OHLCData(100.0, 110.0, 90.0, 100.0, datetime(2025, 1, 1).date()))
+
+
+def candle(high, low, close=None):
+    close = (high + low) / 2 if close is None else close
+    return CandleData(0, low, high, low, close, 0, None, "")
+
+
+def boundary_candles(level_value):
+    """Candles whose high/low sit on and just around the touch and cross tolerance edges."""
+    touch = level_value * DETECTOR._tol_factor
+    cross = level_value * DETECTOR._strict_tol_factor
+    eps = level_value * 1e-12
+    edges = [0.0, touch, -touch, cross, -cross, touch + eps, -touch - eps, touch - eps, 
+             -touch + eps, 2 * touch, -2 * touch]
+    for low_edge, high_edge in itertools.product(edges, repeat=2):
+        low, high = level_value + low_edge, level_value + high_edge
+        if low <= high:
+            yield candle(high, low)
+    # Far away from the level on either side
+    yield candle(level_value * 1.02, level_value * 1.015)
+    yield candle(level_value * 0.985, level_value * 0.98)
+
+
+def previous_candles(level_value):
+    """No previous candle, or one clearly above, clearly below, or straddling the level."""
+    yield None
+    yield candle(level_value * 1.01, level_value * 1.005, level_value * 1.007)
+    yield candle(level_value * 0.995, level_value * 0.99, level_value * 0.993)
+    yield candle(level_value * 1.005, level_value * 0.995, level_value)
+
+
+CASES = [
+    (level_type, previous, current)
+    for level_type in KEY_LEVELS
+    for previous in previous_candles(LEVELS.get_level(level_type))
+    for current in boundary_candles(LEVELS.get_level(level_type))
+]
+
+
+@pytest.mark.parametrize("level_type, previous, current", CASES)
+def test_scan_rows_agree_with_per_level_checks(level_type, previous, current):
+    history = CandleHistory()
+    if previous is not None:
+        history.append(previous)
+    history.append(current)
+    level_value = LEVELS.get_level(level_type)
+    
+    expected = DETECTOR.check_level_touch_with_filters(
+        current, level_value, recent_candles=history, level_type=level_type.value)
+    mask = DETECTOR.scan_touches(current, LEVELS, history, (level_type,))
+    
+    assert bool(mask & LEVEL_BITS[level_type]) == expected
+
+
+def test_touch_cases_are_exercised():
+    # Guard against a grid that only ever produces misses
+    touched = sum(
+        DETECTOR.check_level_touch_with_filters(c, LEVELS.get_level(lt), level_type=lt.value)
+        for lt, _, c in CASES
+    )
+    assert 0 < touched < len(CASES)
+
+
+def test_level_rows_are_named_and_bounded():
+    rows = DETECTOR.level_rows(LEVELS, KEY_LEVELS)
+    assert [row.level_type for row in rows] == list(KEY_LEVELS)
+    for row in rows:
+        assert isinstance(row, LevelRow)
+        assert row.lower < row.value - row.tolerance < row.value + row.tolerance < row.upper
+        assert row.cross_below == row.value - row.cross_tolerance
+        assert row.cross_above == row.value + row.cross_tolerance
+
+
+def reference_touch(detector, c, level_value):
+    """check_level_touch() without the early reject."""
+    tolerance = level_value * detector._tol_factor
+    if not (c.low - tolerance) <= level_value <= (c.high + tolerance):
+        return False
+    significance = min(abs(c.low - level_value), abs(c.high - level_value))
+    return significance <= tolerance and (c.high - c.low) > tolerance * 2
+
+
+@pytest.mark.parametrize("tolerance_percent", [0.01, 0.05, 0.15])
+@pytest.mark.parametrize("level_value", [100.0, 0.5, 25000.0, 0.0, -100.0])
+def test_early_reject_never_changes_touch_result(tolerance_percent, level_value):
+    detector = LevelTouchDetector(tolerance_percent=tolerance_percent)
+    magnitude = abs(level_value) or 1.0
+    for c in boundary_candles(magnitude):
+        shifted = candle(c.high - magnitude + level_value, c.low - magnitude + level_value)
+        assert detector.check_level_touch(shifted, level_value) == reference_touch(detector, shifted, level_value)
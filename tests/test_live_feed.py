@@ -0,0 +1,67 @@
+from cpr_bot import LiveCandleFeed
+
+T0 = 1_700_000_040  # Start of a 60s bar
+
+
+def make_feed(bar_seconds=60):
+    feed = LiveCandleFeed(bar_seconds)
+    feed.connected = True
+    return feed
+
+
+def test_ticks_within_a_bar_build_ohlc_and_volume():
+    feed = make_feed()
+    feed.on_tick("NSE:A-EQ", 100.0, T0, 1_000)
+    feed.on_tick("NSE:A-EQ", 103.0, T0 + 10, 1_200)
+    feed.on_tick("NSE:A-EQ", 98.5, T0 + 20, 1_500)
+    feed.on_tick("NSE:A-EQ", 101.0, T0 + 59, 1_600)
+    
+    # Still forming at T0 + 59, so nothing has closed yet
+    assert feed.latest_candle("NSE:A-EQ", now=T0 + 59) is None
+    
+    candle = feed.latest_candle("NSE:A-EQ", now=T0 + 60)
+    assert candle.timestamp == T0
+    assert (candle.open, candle.high, candle.low, candle.close) == (100.0, 103.0, 98.5, 101.0)
+    assert candle.volume == 600
+
+
+def test_tick_in_next_window_closes_previous_bar():
+    feed = make_feed()
+    feed.on_tick("NSE:A-EQ", 100.0, T0, 0)
+    feed.on_tick("NSE:A-EQ", 102.0, T0 + 30, 0)
+    feed.on_tick("NSE:A-EQ", 105.0, T0 + 61, 0)
+    
+    candle = feed.latest_candle("NSE:A-EQ", now=T0 + 62)
+    assert candle.timestamp == T0
+    assert (candle.open, candle.high, candle.low, candle.close) == (100.0, 102.0, 100.0, 102.0)
+
+
+def test_late_tick_for_an_older_bar_is_ignored():
+    feed = make_feed()
+    feed.on_tick("NSE:A-EQ", 100.0, T0 + 60, 0)
+    feed.on_tick("NSE:A-EQ", 50.0, T0 + 5, 0)
+    
+    candle = feed.latest_candle("NSE:A-EQ", now=T0 + 120)
+    assert candle.low == 100.0
+
+
+def test_quiet_symbol_bar_closes_when_its_window_ends():
+    feed = make_feed()
+    feed.on_tick("NSE:A-EQ", 100.0, T0 + 5, 0)
+    
+    # No further ticks: the bar still closes once its 60s window has passed
+    candle = feed.latest_candle("NSE:A-EQ", now=T0 + 61)
+    assert candle is not None and candle.timestamp == T0
+    assert candle.close == 100.0
+
+
+def test_stale_or_disconnected_feed_returns_none():
+    feed = make_feed()
+    feed.on_tick("NSE:A-EQ", 100.0, T0, 0)
+    
+    # Older than two bars plus slack: callers fall back to REST
+    assert feed.latest_candle("NSE:A-EQ", now=T0 + 60 * 3) is None
+    
+    feed.connected = False
+    assert feed.latest_candle("NSE:A-EQ", now=T0 + 60) is None
+    assert feed.latest_candle("NSE:B-EQ", now=T0 + 60) is None